@@ -1,3 +1,3 @@
-from .computer_use_adapter import run_computer_use_turn
+from .computer_use_adapter import VmInfo, run_computer_use_turn
 
-__all__ = ["run_computer_use_turn"]
+__all__ = ["VmInfo", "run_computer_use_turn"]
@@ -1,18 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, cast
 from uuid import UUID
 
+from anthropic.types.beta import BetaContentBlockParam, BetaMessage, BetaMessageParam
 from sqlalchemy.orm import Session as OrmSession
 
 # IMPORTANT:
 # This module expects you vendored upstream into vendor/computer_use_demo
-# and that it exposes an agent loop function (often named sampling_loop or similar).
+# and that it exposes an agent loop function (sampling_loop).
 # If upstream changes, you only edit THIS adapter.
-import vendor.computer_use_demo.loop as demo_loop  # type: ignore
+from app.agent_engine.conversation import conversation_store
+from app.core.config import settings
 from app.core.events import publish_event
+from app.core.screenshots import screenshot_store, screenshot_url
 from app.models.message import Message as MessageModel
+from vendor.computer_use_demo.loop import APIProvider, sampling_loop
+from vendor.computer_use_demo.tools import ToolResult, ToolVersion
+from vendor.computer_use_demo.tools.bash import output_callback
 
 
 @dataclass
@@ -27,6 +34,41 @@ def _emit(db: OrmSession, session_id: UUID, event_type: str, payload: dict):
     publish_event(db=db, session_id=session_id, event_type=event_type, payload=payload)
 
 
+def _final_text(messages: list[BetaMessageParam]) -> str:
+    for message in reversed(messages):
+        if message["role"] != "assistant":
+            continue
+        content = message["content"]
+        if isinstance(content, str):
+            return content
+        return "\n\n".join(
+            b["text"] for b in content if isinstance(b, dict) and b["type"] == "text"
+        )
+    return ""
+
+
+_USAGE_FIELDS = (
+    "input_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+    "output_tokens",
+)
+
+
+def _turn_usage(usage: list[dict]) -> dict[str, Any]:
+    """Token totals of a turn and the share of input read from the cache."""
+    total = {f: sum(u[f] for u in usage) for f in _USAGE_FIELDS}
+    prompt = (
+        total["input_tokens"]
+        + total["cache_read_input_tokens"]
+        + total["cache_creation_input_tokens"]
+    )
+    total["cache_read_ratio"] = (
+        round(total["cache_read_input_tokens"] / prompt, 3) if prompt else None
+    )
+    return total
+
+
 def run_computer_use_turn(
     *,
     db: OrmSession,
@@ -40,59 +82,145 @@ def run_computer_use_turn(
     Runs ONE user turn through the upstream agent loop and returns final assistant text.
 
     Adapter strategy:
-    - translate upstream callbacks / yielded steps into publish_event(...)
-    - persist assistant message at the end
+    - resume the stored structured conversation (prompt cache stays warm)
+    - translate upstream callbacks / stream events into publish_event(...)
+    - persist the turn's messages and the assistant message at the end
+
+    The tools act on the display configured for the vendored stack
+    (WIDTH / HEIGHT / DISPLAY_NUM), as in upstream.
     """
 
-    _emit(db, session_id, "status", {"status": "running"})
     _emit(db, session_id, "log", {"msg": "Starting computer-use agent loop"})
 
-    # ---- Hook points ----
-    # Upstream loop typically needs:
-    # - client / api key
-    # - model
-    # - tools (computer tool implementation)
-    # - a way to stream intermediate steps
-    #
-    # Because upstream can change, keep all glue code here.
-
-    def on_token(delta: str):
-        _emit(db, session_id, "token", {"delta": delta})
-
-    def on_tool_call(tool_name: str, tool_payload: dict[str, Any]):
-        _emit(db, session_id, "tool_call", {"tool": tool_name, **tool_payload})
-
-    def on_screenshot(image_b64: str | None = None, note: str | None = None):
-        # You can later store screenshots to disk/S3 and emit URL instead.
-        payload = {"note": note}
+    streaming = settings.ANTHROPIC_STREAM
+    # stream index -> tool_use block being generated, for tool_input events
+    streaming_tools: dict[int, dict[str, str]] = {}
+    api_error: list[Exception] = []
+
+    def on_stream_event(event: Any):
+        if event.type == "content_block_start":
+            block = event.content_block
+            if block.type == "tool_use":
+                streaming_tools[event.index] = {"id": block.id, "tool": block.name}
+        elif event.type == "content_block_delta":
+            delta = event.delta
+            if delta.type == "text_delta":
+                _emit(db, session_id, "token", {"delta": delta.text})
+            elif delta.type == "input_json_delta" and event.index in streaming_tools:
+                # partial JSON of the tool input, as generated
+                _emit(
+                    db,
+                    session_id,
+                    "tool_input",
+                    {**streaming_tools[event.index], "delta": delta.partial_json},
+                )
+
+    def on_output(block: BetaContentBlockParam):
+        block = cast(dict[str, Any], block)
+        if block["type"] == "text" and not streaming:
+            _emit(db, session_id, "token", {"delta": block["text"]})
+        elif block["type"] == "tool_use":
+            _emit(
+                db,
+                session_id,
+                "tool_call",
+                {"tool": block["name"], "id": block["id"], **block["input"]},
+            )
+
+    def on_tool_output(result: ToolResult, tool_use_id: str):
+        if result.base64_image or result.screen_diff:
+            on_screenshot(
+                result.base64_image,
+                note=result.system,
+                screen_diff=result.screen_diff,
+                tool_use_id=tool_use_id,
+                settle_s=result.settle_s,
+            )
+        if result.error:
+            _emit(
+                db, session_id, "log", {"msg": result.error, "tool_use_id": tool_use_id}
+            )
+
+    def on_api_response(request: Any, response: Any, error: Exception | None):
+        if error is not None:
+            api_error.append(error)
+
+    usage: list[dict] = []
+
+    def on_response(response: BetaMessage):
+        u = response.usage
+        usage.append({f: getattr(u, f, None) or 0 for f in _USAGE_FIELDS})
+
+    def on_screenshot(
+        image_b64: str | None = None,
+        note: str | None = None,
+        screen_diff: dict | None = None,
+        tool_use_id: str | None = None,
+        settle_s: float | None = None,
+    ):
+        # the image goes to the blob store; events only reference it. The
+        # tool skips images identical to the previous one (no image_b64).
+        payload: dict[str, Any] = {"note": note, "tool_use_id": tool_use_id}
         if image_b64:
-            payload["image_b64"] = image_b64
+            key = screenshot_store.put_b64(image_b64)
+            payload.update(hash=key, url=screenshot_url(key))
+        elif screen_diff and not screen_diff["changed"]:
+            payload["unchanged"] = True
+        if settle_s is not None:
+            payload["settle_ms"] = round(settle_s * 1000)
+        if screen_diff and settings.EVENT_SCREEN_DIFF:
+            payload["diff"] = screen_diff
         _emit(db, session_id, "screenshot", payload)
 
-    # ---- Call upstream loop ----
-    # You will need to adapt this call to match the vendored loop signature.
-    # The official demo has a dedicated agent loop file in computer_use_demo/loop.py.
-    # :contentReference[oaicite:4]{index=4}
-    result = (
-        demo_loop.run_one_turn(  # <- YOU will map this to whatever upstream provides
-            prompt=user_text,
-            vnc_host=vm.vnc_host,
-            vnc_port=vm.vnc_port,
-            model=model,
-            api_key=anthropic_api_key,
-            on_token=on_token,
-            on_tool_call=on_tool_call,
-            on_screenshot=on_screenshot,
+    def on_bash_output(stream: str, text: str):
+        # partial output of a long-running bash command, while it runs
+        _emit(db, session_id, "log", {"msg": text, "stream": stream, "tool": "bash"})
+
+    messages = cast(list[BetaMessageParam], conversation_store.load(db, session_id))
+    start = len(messages)
+    messages.append({"role": "user", "content": [{"type": "text", "text": user_text}]})
+    token = output_callback.set(on_bash_output)
+    try:
+        asyncio.run(
+            sampling_loop(
+                model=model,
+                provider=APIProvider.ANTHROPIC,
+                system_prompt_suffix="",
+                messages=messages,
+                output_callback=on_output,
+                tool_output_callback=on_tool_output,
+                api_response_callback=on_api_response,
+                api_key=anthropic_api_key,
+                max_tokens=settings.ANTHROPIC_MAX_TOKENS,
+                only_n_most_recent_images=settings.ANTHROPIC_KEEP_IMAGES,
+                tool_version=cast(ToolVersion, settings.ANTHROPIC_TOOL_VERSION),
+                base_url=settings.ANTHROPIC_BASE_URL,
+                stream_callback=on_stream_event if streaming else None,
+                response_callback=on_response,
+            )
         )
+    finally:
+        output_callback.reset(token)
+
+    # also after an API error: every stored tool_use has its tool_result
+    conversation_store.append(
+        db, session_id, cast(list[dict], messages), start, usage=usage
     )
+    if api_error:
+        raise RuntimeError(f"Anthropic API error: {api_error[0]}")
 
-    final_text = result if isinstance(result, str) else str(result)
+    final_text = _final_text(messages)
+    turn_usage = _turn_usage(usage)
 
     # persist assistant message
     am = MessageModel(session_id=session_id, role="assistant", content=final_text)
     db.add(am)
     db.commit()
 
-    _emit(db, session_id, "message", {"role": "assistant", "content": final_text})
-    _emit(db, session_id, "status", {"status": "idle"})
+    _emit(
+        db,
+        session_id,
+        "message",
+        {"role": "assistant", "content": final_text, "usage": turn_usage},
+    )
     return final_text
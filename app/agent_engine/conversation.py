@@ -0,0 +1,170 @@
+import base64
+import copy
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session as OrmSession
+
+from app.core.screenshots import screenshot_store
+from app.models.conversation import ConversationMessage
+
+# stands in for a stored screenshot that is no longer in the blob store
+_MISSING_IMAGE = {"type": "text", "text": "[screenshot no longer available]"}
+
+
+def compact_blocks(blocks: Any) -> Any:
+    """
+    Copy of message content for storage: base64 images become screenshot
+    hash references and per-request `cache_control` marks are dropped.
+    """
+    if not isinstance(blocks, list):
+        return blocks
+    out = []
+    for block in blocks:
+        if not isinstance(block, dict):
+            out.append(block)
+            continue
+        block = {k: v for k, v in block.items() if k != "cache_control"}
+        source = block.get("source")
+        if block.get("type") == "image" and source and source.get("type") == "base64":
+            key = screenshot_store.put_b64(source["data"])
+            block["source"] = {"type": "screenshot", "hash": key}
+        elif isinstance(block.get("content"), list):  # tool_result
+            block["content"] = compact_blocks(block["content"])
+        out.append(block)
+    return out
+
+
+def expand_blocks(blocks: Any) -> Any:
+    """Inverse of `compact_blocks`: screenshot references back to base64."""
+    if not isinstance(blocks, list):
+        return blocks
+    out = []
+    for block in blocks:
+        source = block.get("source") if isinstance(block, dict) else None
+        if source and source.get("type") == "screenshot":
+            data = screenshot_store.get(source["hash"])
+            if data is None:
+                out.append(dict(_MISSING_IMAGE))
+                continue
+            block = {
+                **block,
+                "source": {
+                    "type": "base64",
+                    "media_type": "image/png",
+                    "data": base64.b64encode(data).decode(),
+                },
+            }
+        elif isinstance(block, dict) and isinstance(block.get("content"), list):
+            block = {**block, "content": expand_blocks(block["content"])}
+        out.append(block)
+    return out
+
+
+def strip_cache_control(messages: list[dict]) -> None:
+    for message in messages:
+        if isinstance(message["content"], list):
+            for block in message["content"]:
+                if isinstance(block, dict):
+                    block.pop("cache_control", None)
+
+
+@dataclass
+class _Cached:
+    messages: list[dict] = field(default_factory=list)
+    next_position: int = 0
+
+
+class ConversationStore:
+    """
+    The structured conversation of each session (what `sampling_loop` sends
+    to the model), persisted per message in `conversation_messages`.
+
+    Workers keep recently used conversations in memory (LRU) and only load
+    rows past the last position they know, so a session's history is read
+    once per worker and resumes on any worker with the same prefix, keeping
+    prompt-cache hits across turns.
+    """
+
+    def __init__(self, max_sessions: int = 32):
+        self.max_sessions = max_sessions
+        self._cache: OrderedDict[UUID, _Cached] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, db: OrmSession, session_id: UUID) -> list[dict]:
+        """The conversation so far, as a fresh list the caller may mutate."""
+        with self._lock:
+            cached = self._cache.pop(session_id, None) or _Cached()
+        rows = db.scalars(
+            select(ConversationMessage)
+            .where(
+                ConversationMessage.session_id == session_id,
+                ConversationMessage.position >= cached.next_position,
+            )
+            .order_by(ConversationMessage.position)
+        ).all()
+        for row in rows:
+            cached.messages.append(
+                {"role": row.role, "content": expand_blocks(row.content)}
+            )
+            cached.next_position = row.position + 1
+        self._remember(session_id, cached)
+        return copy.deepcopy(cached.messages)
+
+    def append(
+        self,
+        db: OrmSession,
+        session_id: UUID,
+        messages: list[dict],
+        start: int,
+        usage: list[dict | None] | None = None,
+    ) -> None:
+        """
+        Store `messages[start:]` (the messages added this turn) after the
+        `start` stored ones. `usage` lines up with the new assistant messages.
+        """
+        new = messages[start:]
+        usage_iter = iter(usage or [])
+        for i, message in enumerate(new):
+            db.add(
+                ConversationMessage(
+                    session_id=session_id,
+                    position=start + i,
+                    role=message["role"],
+                    content=compact_blocks(message["content"]),
+                    usage=(
+                        next(usage_iter, None)
+                        if message["role"] == "assistant"
+                        else None
+                    ),
+                )
+            )
+        db.commit()
+
+        with self._lock:
+            cached = self._cache.pop(session_id, None)
+        if cached is None or cached.next_position != start:
+            return  # unknown prefix here: the next load reads it from the DB
+        # the whole list, as sent: the loop may have pruned older images, and
+        # the next turn should resume with the same (cached) prompt prefix
+        strip_cache_control(messages)
+        cached.messages = copy.deepcopy(messages)
+        cached.next_position = start + len(new)
+        self._remember(session_id, cached)
+
+    def forget(self, session_id: UUID) -> None:
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+    def _remember(self, session_id: UUID, cached: _Cached) -> None:
+        with self._lock:
+            self._cache[session_id] = cached
+            while len(self._cache) > self.max_sessions:
+                self._cache.popitem(last=False)
+
+
+conversation_store = ConversationStore()
@@ -1,6 +1,12 @@
 from fastapi import APIRouter
 
-from app.core.redis import get_redis
+from app.core.db import db_pool_stats
+from app.core.events import event_sink
+from app.core.hub import event_hub
+from app.core.redis import get_redis, pool_stats
+from app.core.session_cache import session_cache
+from app.session_runner.lifecycle import lifecycle
+from app.session_runner.pool import vm_pool
 
 router = APIRouter(tags=["health"])
 
@@ -9,4 +15,14 @@ router = APIRouter(tags=["health"])
 def health():
     r = get_redis()
     pong = r.ping()
-    return {"ok": True, "redis": pong}
+    return {
+        "ok": True,
+        "redis": pong,
+        "sse": event_hub.stats(),
+        "events": event_sink.stats(),
+        "redis_pool": pool_stats(),
+        "db_pool": db_pool_stats(),
+        "session_cache": session_cache.stats(),
+        "vm_pool": vm_pool.stats(),
+        "vm_lifecycle": lifecycle.stats(),
+    }
@@ -1,37 +1,67 @@
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
-from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import get_db
+from app.api.pagination import ndjson_response, set_next_cursor
+from app.core.config import settings
+from app.core.db import get_async_db
 from app.models.message import Message as MessageModel
 from app.models.session import Session as SessionModel
 
 router = APIRouter(prefix="/v1/sessions", tags=["history"])
 
 
+def _message_out(m: MessageModel) -> dict:
+    return {
+        "id": str(m.id),
+        "role": m.role,
+        "content": m.content,
+        "created_at": m.created_at.isoformat(),
+    }
+
+
 @router.get("/{session_id}/history")
-def history(session_id: UUID, db: OrmSession = Depends(get_db)):
-    s = db.get(SessionModel, session_id)
+async def history(
+    session_id: UUID,
+    response: Response,
+    after_id: int | None = None,
+    before: int | None = None,
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_PAGE_MAX),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Messages of a session, oldest first, one page at a time (keyset on id).
+
+    - `after_id`: the `limit` messages after that id; `X-Next-Cursor` is the
+      `after_id` of the next page (set while pages are full)
+    - `before` / no cursor: the latest `limit` messages before that id (or
+      overall); `X-Next-Cursor` is the `before` of the older page
+    - `format=ndjson`: every message (after `after_id`), streamed
+    """
+    s = await db.get(SessionModel, session_id)
     if not s:
         raise HTTPException(404, "Session not found")
 
-    msgs = (
-        db.execute(
-            select(MessageModel)
-            .where(MessageModel.session_id == session_id)
-            .order_by(MessageModel.id.asc())
-        )
-        .scalars()
-        .all()
-    )
-    return [
-        {
-            "id": str(m.id),
-            "role": m.role,
-            "content": m.content,
-            "created_at": m.created_at.isoformat(),
-        }
-        for m in msgs
-    ]
+    stmt = select(MessageModel).where(MessageModel.session_id == session_id)
+    if format == "ndjson":
+        if after_id is not None:
+            stmt = stmt.where(MessageModel.id > after_id)
+        return ndjson_response(stmt.order_by(MessageModel.id.asc()), _message_out)
+
+    if after_id is not None:
+        stmt = stmt.where(MessageModel.id > after_id).order_by(MessageModel.id.asc())
+        msgs = (await db.scalars(stmt.limit(limit))).all()
+        if len(msgs) == limit:
+            set_next_cursor(response, msgs[-1].id)
+    else:
+        if before is not None:
+            stmt = stmt.where(MessageModel.id < before)
+        stmt = stmt.order_by(MessageModel.id.desc())
+        msgs = (await db.scalars(stmt.limit(limit))).all()[::-1]
+        if len(msgs) == limit:
+            set_next_cursor(response, msgs[0].id)
+    return [_message_out(m) for m in msgs]
@@ -1,47 +1,57 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session as OrmSession
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas import MessageIn, MessageOut
 from app.core.auth import require_api_key
-from app.core.db import get_db
+from app.core.db import SessionLocal, get_async_db
 from app.core.events import publish_event
-from app.core.queue import enqueue
+from app.core.scheduler import enqueue
+from app.core.session_cache import session_cache
 from app.models.message import Message as MessageModel
-from app.models.session import Session as SessionModel
+from app.session_runner.lifecycle import touch_activity
 
 router = APIRouter(prefix="/v1/sessions", tags=["messages"])
 
 
+def _queue_turn(session_id: UUID, message_id: int) -> None:
+    # enqueue job (a paused desktop is resumed by the worker)
+    touch_activity(session_id)
+    enqueue({"session_id": str(session_id), "message_id": str(message_id)})
+
+    # emit queued event (the DB session is only used with
+    # EVENT_PERSIST_MODE=sync)
+    with SessionLocal() as db:
+        publish_event(
+            db=db,
+            session_id=session_id,
+            event_type="status",
+            payload={"status": "queued", "message_id": str(message_id)},
+        )
+
+
 @router.post("/{session_id}/messages", response_model=MessageOut)
-def post_message(
+async def post_message(
     session_id: UUID,
     body: MessageIn,
-    db: OrmSession = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(require_api_key),
 ):
-    s = db.get(SessionModel, session_id)
-    if not s:
+    state = await session_cache.load(db, session_id)
+    if not state:
         raise HTTPException(404, "Session not found")
-    if s.status in ("stopped", "failed"):
-        raise HTTPException(409, f"Session is {s.status}")
+    if state["status"] in ("stopped", "failed"):
+        # a stale "idle" is harmless: the worker checks the DB row again
+        raise HTTPException(409, f"Session is {state['status']}")
 
     # persist user message
     m = MessageModel(session_id=session_id, role="user", content=body.content)
     db.add(m)
-    db.commit()
-    db.refresh(m)
-
-    # enqueue job
-    enqueue({"session_id": str(session_id), "message_id": str(m.id)})
-
-    # emit queued event
-    publish_event(
-        db=db,
-        session_id=session_id,
-        event_type="status",
-        payload={"status": "queued", "message_id": str(m.id)},
-    )
+    await db.commit()
+    await db.refresh(m)
 
+    # Redis (sync client) off the event loop
+    await run_in_threadpool(_queue_turn, session_id, m.id)
     return m
@@ -0,0 +1,56 @@
+import base64
+import json
+from collections.abc import AsyncIterator, Callable
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.core.db import AsyncSessionLocal
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON = "application/x-ndjson"
+STREAM_BATCH_ROWS = 1000
+
+
+def set_next_cursor(response: Response, cursor: str | int | None) -> None:
+    """Cursor of the page after this one, for the client to pass back."""
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = str(cursor)
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError as e:
+        raise HTTPException(400, "Invalid cursor") from e
+
+
+def ndjson_response(stmt: Select, serialize: Callable[[Any], dict]) -> Response:
+    """
+    Stream all rows of `stmt` as newline-delimited JSON, for exports.
+
+    Rows are fetched through a server-side cursor in batches, on a DB session
+    of its own held only while the body streams, so memory stays flat however
+    many rows there are.
+    """
+
+    async def lines() -> AsyncIterator[str]:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream_scalars(
+                stmt.execution_options(yield_per=STREAM_BATCH_ROWS)
+            )
+            async for rows in result.partitions():
+                yield "".join(json.dumps(serialize(r)) + "\n" for r in rows)
+
+    return StreamingResponse(lines(), media_type=NDJSON)
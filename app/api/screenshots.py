@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Header, HTTPException, Response
+from starlette.concurrency import run_in_threadpool
+
+from app.core.screenshots import is_screenshot_hash, screenshot_store
+
+router = APIRouter(prefix="/v1/screenshots", tags=["screenshots"])
+
+# content-addressed: a hash always maps to the same bytes
+_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+
+@router.get("/{screenshot_hash}")
+async def get_screenshot(
+    screenshot_hash: str,
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+):
+    if not is_screenshot_hash(screenshot_hash):
+        raise HTTPException(404, "Screenshot not found")
+
+    etag = f'"{screenshot_hash}"'
+    headers = {**_CACHE_HEADERS, "ETag": etag}
+    if if_none_match and etag in if_none_match:
+        return Response(status_code=304, headers=headers)
+
+    data = await run_in_threadpool(screenshot_store.get, screenshot_hash)
+    if data is None:
+        raise HTTPException(404, "Screenshot not found")
+    return Response(content=data, media_type="image/png", headers=headers)
@@ -1,78 +1,114 @@
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session as OrmSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.pagination import (
+    decode_cursor,
+    encode_cursor,
+    ndjson_response,
+    set_next_cursor,
+)
 from app.api.schemas import SessionOut
 from app.core.auth import require_api_key
-from app.core.db import get_db
+from app.core.config import settings
+from app.core.db import get_async_db
+from app.core.scheduler import enqueue
+from app.core.session_cache import session_cache
 from app.models.session import Session as SessionModel
-from app.session_runner.docker_manager import DockerSessionManager
+from app.session_runner.lifecycle import forget_activity
+from app.session_runner.pool import vm_pool
 
-mgr = DockerSessionManager()
+mgr = vm_pool.manager
 
 router = APIRouter(prefix="/v1/sessions", tags=["sessions"])
 
 
 @router.post("", response_model=SessionOut)
-def create_session(db: OrmSession = Depends(get_db), _=Depends(require_api_key)):
+async def create_session(
+    db: AsyncSession = Depends(get_async_db), _=Depends(require_api_key)
+):
     s = SessionModel(status="creating")
     db.add(s)
-    db.commit()
-    db.refresh(s)
+    await db.commit()
+    await db.refresh(s)
+    await session_cache.aput(s)
 
+    # the worker starts the VM and streams pulling/starting/ready status
+    # events; messages posted meanwhile queue up behind provisioning
     try:
-        vm = mgr.start(session_id=str(s.id))
-        s.vm_container_id = vm.container_id
-        s.novnc_url = vm.novnc_url
-        s.vnc_host = vm.vnc_host
-        s.vnc_port = vm.vnc_port
-        s.status = "idle"
-        db.commit()
-        db.refresh(s)
-        return s
+        await run_in_threadpool(enqueue, {"kind": "provision", "session_id": str(s.id)})
     except Exception as e:
         s.status = "failed"
         s.last_error = str(e)
-        db.commit()
-        raise HTTPException(500, f"Failed to start session VM: {e}") from e
+        await db.commit()
+        await session_cache.aput(s)
+        raise HTTPException(503, f"Failed to schedule session VM: {e}") from e
+    return s
 
 
 @router.get("/{session_id}", response_model=SessionOut)
-def get_session(session_id: UUID, db: OrmSession = Depends(get_db)):
-    s = db.get(SessionModel, session_id)
-    if not s:
+async def get_session(session_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    # polled by the frontend: served from the session cache when possible
+    state = await session_cache.load(db, session_id)
+    if not state:
         raise HTTPException(404, "Session not found")
-    return s
+    return state
 
 
 @router.get("", response_model=list[SessionOut])
-def list_sessions(db: OrmSession = Depends(get_db)):
-    rows = (
-        db.execute(select(SessionModel).order_by(SessionModel.created_at.desc()))
-        .scalars()
-        .all()
+async def list_sessions(
+    response: Response,
+    before: str | None = None,
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_PAGE_MAX),
+    format: Literal["json", "ndjson"] = "json",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Sessions, newest first. `before` is the `X-Next-Cursor` of the previous
+    page (keyset on created_at, id); `format=ndjson` streams all of them.
+    """
+    stmt = select(SessionModel).order_by(
+        SessionModel.created_at.desc(), SessionModel.id.desc()
     )
+    if before is not None:
+        stmt = stmt.where(
+            tuple_(SessionModel.created_at, SessionModel.id) < decode_cursor(before)
+        )
+    if format == "ndjson":
+        return ndjson_response(
+            stmt, lambda s: SessionOut.model_validate(s).model_dump(mode="json")
+        )
+
+    rows = (await db.scalars(stmt.limit(limit))).all()
+    if len(rows) == limit:
+        set_next_cursor(response, encode_cursor(rows[-1].created_at, rows[-1].id))
     return rows
 
 
 @router.post("/{session_id}/stop", response_model=SessionOut)
-def stop_session(
-    session_id: UUID, db: OrmSession = Depends(get_db), _=Depends(require_api_key)
+async def stop_session(
+    session_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    _=Depends(require_api_key),
 ):
-    s = db.get(SessionModel, session_id)
+    s = await db.get(SessionModel, session_id)
     if not s:
         raise HTTPException(404, "Session not found")
 
     if s.vm_container_id:
         try:
-            mgr.stop(s.vm_container_id)
+            await run_in_threadpool(mgr.stop, s.vm_container_id)
         except Exception as e:
             # keep going; we still mark session stopped
             s.last_error = f"Failed stopping container: {e}"
 
     s.status = "stopped"
-    db.commit()
-    db.refresh(s)
+    await db.commit()
+    await run_in_threadpool(forget_activity, s.id)
+    await db.refresh(s)
+    await session_cache.aput(s)
     return s
@@ -1,65 +1,180 @@
 import json
-import time
+from datetime import timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Header
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session as OrmSession
+from sqlalchemy import select
 
-from app.core.db import get_db
-from app.core.redis import get_redis
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.events import event_body, parse_log_entries, replay_log_key, seq_key
+from app.core.hub import event_hub
+from app.core.redis import get_async_redis
 from app.models.event import Event as EventModel
+from app.models.session import Session as SessionModel
 
 router = APIRouter(prefix="/v1/sessions", tags=["streaming"])
 
 
-def _format_sse(event: str, data: dict) -> str:
-    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+def _format_sse(event: str, data: dict, seq: int | None = None) -> str:
+    head = f"id: {seq}\n" if seq is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
-@router.get("/{session_id}/events")
-def sse_events(session_id: UUID, db: OrmSession = Depends(get_db)):
+def _parse_last_event_id(value: str | None) -> int | None:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _since_session_start(session_id: UUID):
     """
-    SSE stream of live events. Also sends a small backlog from DB first.
+    created_at bound that limits event queries to the partitions since the
+    session started (a day early: older sessions have naive UTC timestamps).
     """
-    r = get_redis()
-    channel = f"sessions:{session_id}:events"
-
-    def gen():
-        # 1) Send backlog (last 50 events) so refresh doesn't lose context
-        backlog = (
-            db.query(EventModel)
-            .filter(EventModel.session_id == session_id)
-            .order_by(EventModel.created_at.desc())
-            .limit(50)
-            .all()
+    started = select(SessionModel.created_at - timedelta(days=1)).where(
+        SessionModel.id == session_id
+    )
+    return EventModel.created_at >= started.scalar_subquery()
+
+
+async def _load_recent(session_id: UUID) -> list[dict]:
+    """Backlog for a fresh client: the last SSE_BACKLOG_SIZE events."""
+    r = get_async_redis()
+    entries = await r.xrevrange(
+        replay_log_key(session_id), count=settings.SSE_BACKLOG_SIZE
+    )
+    if entries:
+        return list(reversed(parse_log_entries(entries)))
+
+    # replay log expired (old session) - fall back to the DB
+    # (session_id, seq) index of each partition, newest first
+    stmt = (
+        select(EventModel)
+        .where(
+            EventModel.session_id == session_id,
+            EventModel.seq.is_not(None),
+            _since_session_start(session_id),
         )
-        for ev in reversed(backlog):
-            yield _format_sse(ev.type, ev.payload)
+        .order_by(EventModel.seq.desc())
+        .limit(settings.SSE_BACKLOG_SIZE)
+    )
+    async with AsyncSessionLocal() as db:
+        rows = (await db.scalars(stmt)).all()
+    return [event_body(ev) for ev in reversed(rows)]
 
-        # 2) Subscribe to Redis for real-time events
-        pubsub = r.pubsub()
-        pubsub.subscribe(channel)
 
-        # 3) Heartbeat to keep proxies from closing connection
-        last_ping = time.time()
+async def _load_missed(session_id: UUID, last_seq: int) -> list[dict] | None:
+    """
+    Exactly the events with seq > last_seq: from the Redis replay log while it
+    still covers the range, topped up from the (session_id, seq) DB index.
+    Coalesced rows from the DB are sent whole, or not at all if the client
+    already got part of their run. None if the session's seqs are behind
+    last_seq (Redis lost the counter before it was re-seeded).
+    """
+    pipe = get_async_redis().pipeline(transaction=False)
+    pipe.get(seq_key(session_id))
+    pipe.xrange(replay_log_key(session_id), min=f"{last_seq + 1}-0")
+    current, entries = await pipe.execute()
+    if current is not None and int(current) < last_seq:
+        return None  # counter restarted below the client (lost by Redis)
+    if current is None or int(current) == last_seq:
+        return []
 
+    bodies = parse_log_entries(entries)
+    first = bodies[0]["seq"] if bodies else int(current) + 1
+    if first > last_seq + 1:
+        # log was trimmed past the client's position: fill the hole
+        stmt = (
+            select(EventModel)
+            .where(
+                EventModel.session_id == session_id,
+                EventModel.seq > last_seq,
+                EventModel.seq < first,
+                _since_session_start(session_id),
+            )
+            .order_by(EventModel.seq.asc())
+        )
+        # a coalesced row (first_seq..seq) may reach into the log; only the
+        # next row after the hole can
+        after = (
+            select(EventModel)
+            .where(
+                EventModel.session_id == session_id,
+                EventModel.seq >= first,
+                _since_session_start(session_id),
+            )
+            .order_by(EventModel.seq.asc())
+            .limit(1)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = list((await db.scalars(stmt)).all())
+            nxt = await db.scalar(after)
+        if nxt is not None and nxt.first_seq is not None and nxt.first_seq < first:
+            rows.append(nxt)
+        # a merged row the client saw part of can't be split: skipped
+        rows = [ev for ev in rows if ev.first_seq is None or ev.first_seq > last_seq]
+        if rows and rows[-1].seq >= first:
+            # the merged row already holds these deltas
+            end, etype = rows[-1].seq, rows[-1].type
+            bodies = [b for b in bodies if b["seq"] > end or b["type"] != etype]
+        bodies = [event_body(ev) for ev in rows] + bodies
+    return bodies
+
+
+@router.get("/{session_id}/events")
+async def sse_events(
+    session_id: UUID,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+):
+    """
+    SSE stream of live events.
+
+    Fresh clients get a small backlog first; reconnecting clients (EventSource
+    sends `Last-Event-ID` automatically) get exactly the events they missed.
+    Subscribing to the hub *before* reading the backlog means nothing falls
+    between the two; overlap is dropped by sequence number. A DB connection
+    is only taken for a backlog the replay log no longer has, and returned
+    before the live part of the stream.
+    """
+    last_seq = _parse_last_event_id(last_event_id)
+
+    async def gen():
+        sub = event_hub.subscribe(str(session_id))
+        sent = last_seq or 0
         try:
-            for msg in pubsub.listen():
-                # redis sends subscribe messages too
-                if msg["type"] == "message":
-                    body = json.loads(msg["data"])
-                    yield _format_sse(body["type"], body["payload"])
-
-                # heartbeat every ~15s
-                if time.time() - last_ping > 15:
+            # 1) Replay backlog / missed range
+            backlog = None
+            if last_seq is not None:
+                backlog = await _load_missed(session_id, last_seq)
+                if backlog is None:
+                    sent = 0  # seqs start over: treat it as a fresh client
+            if backlog is None:
+                backlog = await _load_recent(session_id)
+            for body in backlog:
+                if body["seq"] is not None:
+                    sent = max(sent, body["seq"])
+                yield _format_sse(body["type"], body["payload"], body["seq"])
+
+            # 2) Live events from the in-process hub
+            while True:
+                try:
+                    body = await sub.get(timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except TimeoutError:
+                    # 3) Heartbeat to keep proxies from closing connection
                     yield ": ping\n\n"
-                    last_ping = time.time()
+                    continue
+
+                if body is None:
+                    # hub closed us (slow consumer / shutdown); client reconnects
+                    return
+                if body["seq"] <= sent:
+                    continue  # already sent as part of the backlog
+                sent = body["seq"]
+                yield _format_sse(body["type"], body["payload"], sent)
         finally:
-            try:
-                pubsub.unsubscribe(channel)
-                pubsub.close()
-            except Exception:
-                pass
+            event_hub.unsubscribe(sub)
 
     return StreamingResponse(gen(), media_type="text/event-stream")
@@ -15,7 +15,65 @@ class Settings(BaseSettings):
 
     # --- Database / cache ---
     DATABASE_URL: str = "postgresql+psycopg://postgres:postgres@db:5432/agent"
+    # per engine (sync + async) and process; connections beyond the pool
+    # size are opened on demand up to the overflow and closed when returned
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0  # wait for a free connection
+    DB_POOL_RECYCLE_SECONDS: int = 1800
     REDIS_URL: str = "redis://redis:6379/0"
+    # Per-process pool, shared by queue, locks, events, health and streaming.
+    # Blocking queue reads and the SSE subscription each hold one connection.
+    REDIS_MAX_CONNECTIONS: int = 64
+    REDIS_POOL_TIMEOUT_SECONDS: float = 5.0  # wait for a free connection
+
+    # --- Job queue (Redis Streams) ---
+    QUEUE_CLAIM_IDLE_SECONDS: int = 600  # pending this long => worker presumed dead
+    # deliveries of a session token / crashed tries of a job, then the job
+    # goes to the dead-letter stream
+    QUEUE_MAX_DELIVERIES: int = 5
+    SESSION_MAX_JOBS_PER_CLAIM: int = 8  # then a busy session yields its worker
+
+    # --- Worker ---
+    WORKER_CONCURRENCY: int = 4  # concurrent turns per worker process
+    WORKER_PROCESSES: int = 1  # e.g. one per core
+    LOCK_TTL_SECONDS: int = 180
+    LOCK_RENEW_SECONDS: float = 60.0  # renew session lock + claim while running
+
+    # --- Event persistence ---
+    # batched: publish immediately, insert rows write-behind in batches
+    # sync: one INSERT + COMMIT per event (previous behaviour)
+    EVENT_PERSIST_MODE: Literal["batched", "sync"] = "batched"
+    EVENT_FLUSH_BATCH_SIZE: int = 200
+    EVENT_FLUSH_INTERVAL_MS: int = 250
+    EVENT_BUFFER_MAX: int = 50_000  # rows kept while the DB is unreachable
+    # Storage policy per event type (JSON lists in env), everything else durable:
+    # live-only types are streamed and replayable from Redis but never stored;
+    # coalesced types have consecutive events merged into one row per window
+    EVENT_LIVE_ONLY_TYPES: list[str] = ["tool_input"]
+    EVENT_COALESCE_TYPES: list[str] = ["token"]
+    EVENT_COALESCE_WINDOW_MS: int = 2000
+    # add the changed region ({"changed", "bbox", "ratio"}) to screenshot events
+    EVENT_SCREEN_DIFF: bool = False
+    # daily partitions of `events`, created ahead by the worker and the API;
+    # partitions older than the retention are exported to EVENT_ARCHIVE_DIR,
+    # then dropped
+    EVENT_PARTITIONS_AHEAD_DAYS: int = 7
+    EVENT_RETENTION_DAYS: int = 30  # 0 keeps everything
+    EVENT_ARCHIVE_DIR: str = "/data/event-archive"
+    EVENT_MAINTENANCE_INTERVAL_SECONDS: float = 3600.0
+
+    # --- SSE streaming ---
+    SSE_CLIENT_QUEUE_SIZE: int = 256  # buffered events per connected client
+    SSE_SLOW_CONSUMER_POLICY: Literal["drop_oldest", "disconnect"] = "disconnect"
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_BACKLOG_SIZE: int = 50  # events sent to a fresh (non-resuming) client
+    SSE_REPLAY_LOG_SIZE: int = 1000  # per-session Redis replay log (approx. cap)
+    SSE_REPLAY_LOG_TTL_SECONDS: int = 24 * 3600
+
+    # --- Screenshots (content-addressed blobs, served at /v1/screenshots) ---
+    SCREENSHOT_BACKEND: Literal["local"] = "local"
+    SCREENSHOT_DIR: str = "/data/screenshots"  # shared by API and worker
 
     # --- Networking ---
     PUBLIC_HOST: str = "localhost"  # host where browser accesses mapped ports
@@ -24,12 +82,48 @@ class Settings(BaseSettings):
     COMPUTER_USE_IMAGE: str = (
         "ghcr.io/anthropics/anthropic-quickstarts:computer-use-demo-latest"
     )
+    DOCKER_CLIENT: Literal["docker", "fake"] = "docker"  # fake: in-memory, no daemon
+
+    # --- Warm VM pool (idle containers claimed on session create) ---
+    VM_POOL_TARGET_SIZE: int = 2  # idle containers to keep ready; 0 disables
+    VM_POOL_MAX_SIZE: int = 4  # idle containers beyond this are removed
+    VM_POOL_REFILL_SECONDS: float = 5.0  # also refilled right after each claim
+    VM_POOL_HEALTHCHECK_SECONDS: float = 30.0
+
+    # --- Session lifecycle (idle reaper, in the worker); 0 disables a step ---
+    SESSION_PAUSE_AFTER_SECONDS: int = 15 * 60  # docker pause the desktop
+    SESSION_STOP_AFTER_SECONDS: int = 2 * 3600  # remove it, session stopped
+    REAPER_INTERVAL_SECONDS: float = 30.0
+
+    # --- Session state cache (Redis, plus an in-process LRU in the API) ---
+    SESSION_CACHE_ENABLED: bool = True
+    SESSION_CACHE_TTL_SECONDS: int = 3600  # Redis copy, refilled from the DB
+    SESSION_CACHE_LOCAL_SIZE: int = 10_000  # sessions per API process; 0 disables
+    # bound on staleness should an invalidation message be lost
+    SESSION_CACHE_LOCAL_TTL_SECONDS: float = 30.0
 
     AGENT_MODE: Literal["mock", "anthropic"] = "mock"
 
     # --- Anthropic / Claude ---
     ANTHROPIC_API_KEY: str | None = None
     ANTHROPIC_MODEL: str = "claude-3-5-sonnet-latest"
+    ANTHROPIC_BASE_URL: str | None = None  # e.g. a local stub server
+    # one client and connection pool per worker process, reused across turns
+    ANTHROPIC_MAX_CONNECTIONS: int = 20
+    ANTHROPIC_MAX_KEEPALIVE: int = 10
+    ANTHROPIC_KEEPALIVE_SECONDS: float = 60.0
+    ANTHROPIC_HTTP2: bool = True  # when the `h2` package is installed
+    # stream responses: token / tool_input events as the model generates
+    ANTHROPIC_STREAM: bool = True
+    ANTHROPIC_TOOL_VERSION: str = "computer_use_20250124"
+    ANTHROPIC_MAX_TOKENS: int = 4096
+    # screenshots sent per request: older ones are dropped this many at a
+    # time (between N and 2N-1 are kept); None sends all of them
+    ANTHROPIC_KEEP_IMAGES: int | None = 10
+
+    # --- History / session list pages (keyset pagination) ---
+    HISTORY_PAGE_SIZE: int = 200
+    HISTORY_PAGE_MAX: int = 1000
 
     # --- API auth (frontend → backend) ---
     API_KEY: str | None = None
@@ -1,11 +1,29 @@
+from typing import Any
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+_pool_args = dict(
+    pool_pre_ping=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+)
+
+# sync: worker, event sink, maintenance threads
+engine = create_engine(settings.DATABASE_URL, **_pool_args)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# async (psycopg async driver, same URL): API endpoints
+async_engine = create_async_engine(settings.DATABASE_URL, **_pool_args)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 class Base(DeclarativeBase):
     pass
@@ -17,3 +35,21 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _stats(pool) -> dict[str, Any]:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+    }
+
+
+def db_pool_stats() -> dict[str, Any]:
+    """Connections per pool of this process (checked out = in use)."""
+    return {"sync": _stats(engine.pool), "async": _stats(async_engine.pool)}
@@ -0,0 +1,203 @@
+"""
+Daily range partitions of the `events` table: creation ahead of time and
+retention (old partitions are exported to gzip'd CSV, then dropped).
+
+Runs in the worker (`event_partitions.start()`); one process per interval
+does the work (Redis lock). The API also creates partitions on startup. Rows
+for a day without a partition land in the DEFAULT partition, and are moved
+into the day's partition when it is created. Once by hand:
+
+    python -m app.core.event_partitions
+"""
+
+import gzip
+import os
+import re
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import Connection, text
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.locks import acquire_lock
+
+PARTITION_PREFIX = "events_p"
+DEFAULT_PARTITION = "events_default"
+_NAME = re.compile(rf"^{PARTITION_PREFIX}(\d{{8}})$")
+
+
+def partition_name(day: date) -> str:
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def list_partitions(conn: Connection) -> list[tuple[str, date]]:
+    """Attached daily partitions of `events`, oldest first."""
+    names = conn.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'events'::regclass"
+        )
+    ).all()
+    out = []
+    for name in names:
+        m = _NAME.match(name)
+        if m:
+            out.append((name, datetime.strptime(m.group(1), "%Y%m%d").date()))
+    return sorted(out, key=lambda p: p[1])
+
+
+def ensure_partitions(days_ahead: int, today: date | None = None) -> list[str]:
+    """
+    Create the partitions for today, the next `days_ahead` days and any day
+    that has rows in the DEFAULT partition.
+    """
+    today = today or _utc_today()
+    created = []
+    with engine.begin() as conn:
+        # the worker and every API process run this
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('events_p'))"))
+        existing = {name for name, _ in list_partitions(conn)}
+        days = {today + timedelta(days=i) for i in range(days_ahead + 1)}
+        days.update(
+            conn.scalars(
+                text(
+                    "SELECT DISTINCT (created_at AT TIME ZONE 'UTC')::date "
+                    f"FROM {DEFAULT_PARTITION}"
+                )
+            )
+        )
+        for day in sorted(days):
+            name = partition_name(day)
+            if name in existing:
+                continue
+            _create_partition(conn, name, day)
+            created.append(name)
+    return created
+
+
+def _create_partition(conn: Connection, name: str, day: date) -> None:
+    """
+    Postgres refuses a new partition while the DEFAULT partition holds rows
+    for its range: build it as a plain table, move those rows in, attach it.
+    """
+    start, end = f"{day} 00:00+00", f"{day + timedelta(days=1)} 00:00+00"
+    conn.execute(text(f"CREATE TABLE {name} (LIKE events)"))
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": start, "end": end},
+    )
+    # adds the PK, indexes and FK of `events`
+    conn.execute(
+        text(
+            f"ALTER TABLE events ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+
+
+def archive_partitions(
+    retention_days: int, archive_dir: str, today: date | None = None
+) -> list[Path]:
+    """
+    Export every partition whose day ended more than `retention_days` ago to
+    `<archive_dir>/<partition>.csv.gz`, then detach and drop it.
+
+    The export reads the still-attached partition (no new rows arrive for a
+    past day); detach + drop then happen in one short transaction, so a
+    failure at any step leaves the partition in place for the next run.
+    """
+    cutoff = (today or _utc_today()) - timedelta(days=retention_days)
+    out_dir = Path(archive_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with engine.connect() as conn:
+        old = [name for name, day in list_partitions(conn) if day < cutoff]
+
+    archived = []
+    for name in old:
+        path = out_dir / f"{name}.csv.gz"
+        tmp = path.with_suffix(".gz.tmp")
+        with (
+            engine.connect() as conn,
+            conn.connection.driver_connection.cursor() as cur,
+            cur.copy(f"COPY {name} TO STDOUT (FORMAT csv, HEADER)") as copy,
+            gzip.open(tmp, "wb") as f,
+        ):
+            for chunk in copy:
+                f.write(chunk)
+        os.replace(tmp, path)
+
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+            conn.execute(text(f"DROP TABLE {name}"))
+        archived.append(path)
+    return archived
+
+
+def maintain() -> dict[str, list]:
+    created = ensure_partitions(settings.EVENT_PARTITIONS_AHEAD_DAYS)
+    archived: list[Path] = []
+    if settings.EVENT_RETENTION_DAYS > 0:
+        archived = archive_partitions(
+            settings.EVENT_RETENTION_DAYS, settings.EVENT_ARCHIVE_DIR
+        )
+    return {"created": created, "archived": [str(p) for p in archived]}
+
+
+class PartitionMaintainer:
+    """Runs `maintain()` on start and every `interval_seconds`."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="event-partitions", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            # the lock expires instead of being released: once per interval
+            if acquire_lock(
+                "lock:events:partitions", ttl_seconds=max(1, int(self.interval_seconds))
+            ):
+                try:
+                    done = maintain()
+                    if done["created"] or done["archived"]:
+                        print(f"events: partitions {done}")
+                except Exception as e:
+                    print(f"events: partition maintenance failed: {e}")
+            if self._stop.wait(self.interval_seconds):
+                return
+
+
+event_partitions = PartitionMaintainer(
+    interval_seconds=settings.EVENT_MAINTENANCE_INTERVAL_SECONDS
+)
+
+
+if __name__ == "__main__":
+    print(maintain())
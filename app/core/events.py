@@ -1,11 +1,295 @@
+import atexit
 import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
 from uuid import UUID
 
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import InterfaceError, OperationalError
 from sqlalchemy.orm import Session as OrmSession
 
+from app.core.config import settings
+from app.core.db import engine
+from app.core.ids import uuid7
 from app.core.redis import get_redis
 from app.models.event import Event as EventModel
 
+# Assigns the next per-session sequence number, appends the event to the
+# session's replay log and publishes it, atomically. Because all three happen
+# in one script, publish order == seq order == replay log order.
+# A missing counter (new session, or lost by Redis) continues from the replay
+# log, else from ARGV[6], the highest stored seq; -1 (not read yet) returns nil.
+_PUBLISH_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+  local last = redis.call("XREVRANGE", KEYS[2], "+", "-", "COUNT", 1)[1]
+  local floor = tonumber(ARGV[6])
+  if last then
+    floor = math.max(floor, tonumber(string.match(last[1], "^%d+")))
+  elseif floor < 0 then
+    return nil
+  end
+  redis.call("SET", KEYS[1], floor)
+end
+local seq = redis.call("INCR", KEYS[1])
+local msg = '{"seq":' .. seq .. ',"type":' .. ARGV[1]
+  .. ',"payload":' .. ARGV[2] .. '}'
+redis.call("XADD", KEYS[2], "MAXLEN", "~", ARGV[3], seq .. "-0", "e", msg)
+redis.call("EXPIRE", KEYS[2], ARGV[4])
+redis.call("PUBLISH", ARGV[5], msg)
+return seq
+"""
+
+
+def event_channel(session_id: UUID | str) -> str:
+    return f"sessions:{session_id}:events"
+
+
+def seq_key(session_id: UUID | str) -> str:
+    return f"sessions:{session_id}:seq"
+
+
+def replay_log_key(session_id: UUID | str) -> str:
+    return f"sessions:{session_id}:log"
+
+
+def parse_log_entries(entries: list[tuple[str, dict[str, str]]]) -> list[dict]:
+    """Decode XRANGE/XREVRANGE results of a replay log into event bodies."""
+    return [json.loads(fields["e"]) for _, fields in entries]
+
+
+def event_policy(event_type: str) -> str:
+    """
+    Storage class of an event type:
+    - live: pubsub + replay log only, never stored in the DB
+    - coalesce: consecutive events of the type are merged into one stored row
+    - durable: one row per event
+    """
+    if event_type in settings.EVENT_LIVE_ONLY_TYPES:
+        return "live"
+    if event_type in settings.EVENT_COALESCE_TYPES:
+        return "coalesce"
+    return "durable"
+
+
+def _merge_payload(into: dict[str, Any], payload: dict[str, Any]) -> None:
+    # string values are appended (token deltas); anything else: latest wins
+    for k, v in payload.items():
+        prev = into.get(k)
+        if isinstance(prev, str) and isinstance(v, str):
+            into[k] = prev + v
+        else:
+            into[k] = v
+
+
+# flush failures worth retrying the whole batch for
+_CONNECTION_ERRORS = (OperationalError, InterfaceError)
+
+
+class EventSink:
+    """
+    Write-behind persistence for events. Rows are buffered in memory and
+    inserted in batches (one multi-row INSERT) when `batch_size` rows are
+    pending or every `interval_ms`, from a background thread. `flush()` is
+    also called at the end of every turn and on shutdown.
+
+    Coalescible events are held as one open row per session and merged until
+    another event for that session arrives or `coalesce_window_ms` passes
+    since the run started; the merged row covers seqs `first_seq`..`seq`.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        interval_ms: int,
+        max_buffer: int,
+        coalesce_window_ms: int = 0,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval_ms / 1000
+        self.max_buffer = max_buffer
+        self.coalesce_window = timedelta(milliseconds=coalesce_window_ms)
+        self._rows: list[dict[str, Any]] = []
+        self._open: dict[UUID, dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._stats = {
+            "events": 0,
+            "coalesced": 0,
+            "live_only": 0,
+            "flushes": 0,
+            "rows": 0,
+            "max_batch": 0,
+            "dropped": 0,
+            "rejected": 0,
+            "errors": 0,
+            "flush_ms_total": 0.0,
+            "flush_ms_max": 0.0,
+        }
+
+    def add(self, row: dict[str, Any], policy: str = "durable") -> None:
+        with self._cond:
+            self._stats["events"] += 1
+            if policy == "live":
+                self._stats["live_only"] += 1
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="event-sink", daemon=True
+                )
+                self._thread.start()
+
+            sid = row["session_id"]
+            run = self._open.get(sid)
+            if (
+                policy == "coalesce"
+                and run is not None
+                and run["type"] == row["type"]
+                and row["created_at"] - run["created_at"] < self.coalesce_window
+            ):
+                _merge_payload(run["payload"], row["payload"])
+                run["seq"] = row["seq"]
+                self._stats["coalesced"] += 1
+                return
+
+            # any other event for the session ends its coalescing run
+            if run is not None:
+                self._append(self._open.pop(sid))
+            if policy == "coalesce":
+                self._open[sid] = {
+                    **row,
+                    "first_seq": row["seq"],
+                    "payload": dict(row["payload"]),
+                }
+            else:
+                self._append(row)
+
+    def flush(self, force: bool = True) -> int:
+        """
+        Insert everything buffered so far; returns the number of rows.
+        `force=False` (periodic flush) leaves coalescing runs that are still
+        inside their window open.
+        """
+        with self._flush_lock:
+            with self._cond:
+                self._close_runs(force)
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+
+            t0 = time.perf_counter()
+            rejected = 0
+            try:
+                try:
+                    self._write(rows)
+                except _CONNECTION_ERRORS:
+                    raise
+                except Exception as e:
+                    # some row is refused (FK, missing partition, bad data):
+                    # find it instead of blocking every event behind it
+                    print(f"events: batch of {len(rows)} rows failed, row by row: {e}")
+                    rejected = self._write_each(rows)
+            except _CONNECTION_ERRORS as e:
+                # DB unreachable: keep them for the next flush
+                print(f"events: flush of {len(rows)} rows failed: {e}")
+                with self._cond:
+                    self._rows[:0] = rows
+                    self._stats["errors"] += 1
+                return 0
+
+            written = len(rows) - rejected
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            with self._cond:
+                st = self._stats
+                st["flushes"] += 1
+                st["rows"] += written
+                st["rejected"] += rejected
+                st["max_batch"] = max(st["max_batch"], len(rows))
+                st["flush_ms_total"] += elapsed_ms
+                st["flush_ms_max"] = max(st["flush_ms_max"], elapsed_ms)
+            return written
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            st = dict(self._stats)
+            st["buffered"] = len(self._rows) + len(self._open)
+        flushes = st["flushes"] or 1
+        st["avg_batch"] = round(st["rows"] / flushes, 1)
+        st["flush_ms_avg"] = round(st.pop("flush_ms_total") / flushes, 2)
+        st["flush_ms_max"] = round(st["flush_ms_max"], 2)
+        return st
+
+    def _write(self, rows: list[dict[str, Any]]) -> None:
+        with engine.begin() as conn:
+            conn.execute(insert(EventModel), rows)
+
+    def _write_each(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Insert rows one at a time (a savepoint each), logging and dropping
+        the ones the DB refuses; returns how many were dropped.
+        """
+        rejected = 0
+        with engine.begin() as conn:
+            for row in rows:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(insert(EventModel), [row])
+                except _CONNECTION_ERRORS:
+                    raise
+                except Exception as e:
+                    print(
+                        f"events: dropped {row['type']} seq={row['seq']} "
+                        f"of session {row['session_id']}: {e}"
+                    )
+                    rejected += 1
+        return rejected
+
+    def _append(self, row: dict[str, Any]) -> None:
+        self._rows.append(row)
+        if len(self._rows) > self.max_buffer:
+            # DB unreachable for a while; the replay log still has them
+            del self._rows[0]
+            self._stats["dropped"] += 1
+        if len(self._rows) >= self.batch_size:
+            self._cond.notify()
+
+    def _close_runs(self, force: bool) -> None:
+        cutoff = datetime.now(timezone.utc) - self.coalesce_window
+        for sid, run in list(self._open.items()):
+            if force or run["created_at"] <= cutoff:
+                self._append(self._open.pop(sid))
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._rows) >= self.batch_size or self._closed,
+                    timeout=self.interval,
+                )
+                if self._closed:
+                    return
+            self.flush(force=False)
+
+
+event_sink = EventSink(
+    batch_size=settings.EVENT_FLUSH_BATCH_SIZE,
+    interval_ms=settings.EVENT_FLUSH_INTERVAL_MS,
+    max_buffer=settings.EVENT_BUFFER_MAX,
+    coalesce_window_ms=settings.EVENT_COALESCE_WINDOW_MS,
+)
+atexit.register(event_sink.close)
+
 
 def publish_event(
     *,
@@ -13,13 +297,71 @@ def publish_event(
     session_id: UUID,
     event_type: str,
     payload: dict,
-) -> None:
-    # 1) persist to DB
-    ev = EventModel(session_id=session_id, type=event_type, payload=payload)
-    db.add(ev)
-    db.commit()
-
-    # 2) publish to Redis pubsub channel
-    r = get_redis()
-    channel = f"sessions:{session_id}:events"
-    r.publish(channel, json.dumps({"type": event_type, "payload": payload}))
+) -> int:
+    """
+    Publish an event and persist it. Returns the event's sequence number,
+    which clients see as the SSE `id:` and send back as `Last-Event-ID`.
+
+    Live delivery is immediate; with EVENT_PERSIST_MODE=batched (default) the
+    DB insert goes through `event_sink` and `db` is not touched. Storage is
+    per event type, see `event_policy` (coalescing needs batched mode).
+    """
+    # 1) assign seq + append to replay log + publish to Redis pubsub channel
+    seq = _publish(session_id, event_type, payload, floor=-1)
+    if seq is None:
+        # no counter and no replay log: continue after the stored events
+        seq = _publish(session_id, event_type, payload, floor=_max_seq(session_id))
+
+    # 2) persist to DB, according to the event type's storage policy
+    policy = event_policy(event_type)
+    if settings.EVENT_PERSIST_MODE == "sync":
+        if policy != "live":
+            ev = EventModel(
+                session_id=session_id, seq=seq, type=event_type, payload=payload
+            )
+            db.add(ev)
+            db.commit()
+    else:
+        event_sink.add(
+            {
+                "id": uuid7(),
+                "session_id": session_id,
+                "seq": seq,
+                "first_seq": None,
+                "type": event_type,
+                "payload": payload,
+                "created_at": datetime.now(timezone.utc),
+            },
+            policy=policy,
+        )
+    return seq
+
+
+def _publish(
+    session_id: UUID, event_type: str, payload: dict, floor: int
+) -> int | None:
+    seq = get_redis().eval(
+        _PUBLISH_SCRIPT,
+        2,
+        seq_key(session_id),
+        replay_log_key(session_id),
+        json.dumps(event_type),
+        json.dumps(payload),
+        settings.SSE_REPLAY_LOG_SIZE,
+        settings.SSE_REPLAY_LOG_TTL_SECONDS,
+        event_channel(session_id),
+        floor,
+    )
+    return None if seq is None else int(seq)
+
+
+def _max_seq(session_id: UUID) -> int:
+    with engine.connect() as conn:
+        seq = conn.scalar(
+            select(func.max(EventModel.seq)).where(EventModel.session_id == session_id)
+        )
+    return seq or 0
+
+
+def event_body(ev: EventModel) -> dict[str, Any]:
+    return {"seq": ev.seq, "type": ev.type, "payload": ev.payload}
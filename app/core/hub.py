@@ -0,0 +1,168 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any
+
+from app.core.config import settings
+from app.core.redis import get_async_redis
+
+# One pattern subscription per API process covers every session channel.
+CHANNEL_PATTERN = "sessions:*:events"
+
+
+def _session_id_from_channel(channel: str) -> str:
+    # sessions:{session_id}:events
+    return channel.split(":", 2)[1]
+
+
+class Subscriber:
+    """
+    One SSE client. Events are delivered into a bounded queue; a `None` item
+    tells the stream to close (slow consumer or hub shutdown).
+    """
+
+    def __init__(self, session_id: str, maxsize: int):
+        self.session_id = session_id
+        self.queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.closed = False
+
+    async def get(self, timeout: float) -> dict[str, Any] | None:
+        """
+        Wait for the next event. Raises TimeoutError if nothing arrived
+        within `timeout` seconds (caller sends a heartbeat).
+        """
+        return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # make room for the sentinel; pending events are discarded
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    """
+    Shares a single Redis pubsub connection between all SSE streams of this
+    process and fans events out in memory.
+
+    Slow consumers are handled per `SSE_SLOW_CONSUMER_POLICY`:
+    - drop_oldest: discard the oldest queued event for that client
+    - disconnect: close the stream; the browser's EventSource reconnects
+    """
+
+    def __init__(self, queue_size: int, policy: str):
+        self._queue_size = queue_size
+        self._policy = policy
+        self._subs: dict[str, set[Subscriber]] = defaultdict(set)
+        self._task: asyncio.Task | None = None
+        self._counters = {
+            "received": 0,
+            "delivered": 0,
+            "dropped": 0,
+            "disconnected": 0,
+        }
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._close_all()
+
+    def subscribe(self, session_id: str) -> Subscriber:
+        sub = Subscriber(session_id, self._queue_size)
+        self._subs[session_id].add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subs = self._subs.get(sub.session_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subs[sub.session_id]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "sessions": len(self._subs),
+            # list() copies atomically; /health reads this from a threadpool
+            "subscribers": sum(len(s) for s in list(self._subs.values())),
+            **self._counters,
+        }
+
+    def _deliver(self, sub: Subscriber, body: dict[str, Any]) -> None:
+        if sub.closed:
+            return
+        try:
+            sub.queue.put_nowait(body)
+            self._counters["delivered"] += 1
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self._policy == "drop_oldest":
+            sub.queue.get_nowait()
+            sub.queue.put_nowait(body)
+            sub.dropped += 1
+            self._counters["dropped"] += 1
+            self._counters["delivered"] += 1
+        else:
+            sub.close()
+            self._counters["disconnected"] += 1
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        self._counters["received"] += 1
+        subs = self._subs.get(_session_id_from_channel(channel))
+        if not subs:
+            return
+        body = json.loads(data)
+        for sub in list(subs):
+            self._deliver(sub, body)
+
+    def _close_all(self) -> None:
+        for subs in list(self._subs.values()):
+            for sub in list(subs):
+                sub.close()
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            # holds one connection of the shared async pool while subscribed
+            pubsub = get_async_redis().pubsub()
+            try:
+                await pubsub.psubscribe(CHANNEL_PATTERN)
+                backoff = 0.5
+                async for msg in pubsub.listen():
+                    if msg["type"] == "pmessage":
+                        self._dispatch(msg["channel"], msg["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"event hub: redis subscription failed: {e}")
+                # events were missed while disconnected; let clients reconnect
+                self._close_all()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 10.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+event_hub = EventHub(
+    queue_size=settings.SSE_CLIENT_QUEUE_SIZE,
+    policy=settings.SSE_SLOW_CONSUMER_POLICY,
+)
@@ -1,4 +1,7 @@
+import threading
 import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 from app.core.redis import get_redis
@@ -10,13 +13,12 @@ class LockHandle:
     token: str
 
 
-def acquire_session_lock(session_id: str, ttl_seconds: int = 120) -> LockHandle | None:
+def acquire_lock(key: str, ttl_seconds: int) -> LockHandle | None:
     """
     Simple Redis lock:
     SET key token NX EX ttl
     """
     r = get_redis()
-    key = f"lock:session:{session_id}"
     token = str(uuid.uuid4())
     ok = r.set(key, token, nx=True, ex=ttl_seconds)
     if ok:
@@ -24,6 +26,10 @@ def acquire_session_lock(session_id: str, ttl_seconds: int = 120) -> LockHandle
     return None
 
 
+def acquire_session_lock(session_id: str, ttl_seconds: int = 120) -> LockHandle | None:
+    return acquire_lock(f"lock:session:{session_id}", ttl_seconds)
+
+
 def release_session_lock(handle: LockHandle) -> None:
     """
     Safe-ish unlock: delete only if token matches.
@@ -38,3 +44,52 @@ def release_session_lock(handle: LockHandle) -> None:
     end
     """
     r.eval(script, 1, handle.key, handle.token)
+
+
+def renew_session_lock(handle: LockHandle, ttl_seconds: int) -> bool:
+    """
+    Extend the lock's TTL if we still own it. Returns False if the lock expired
+    or was taken over in the meantime.
+    """
+    r = get_redis()
+    script = """
+    if redis.call("GET", KEYS[1]) == ARGV[1] then
+      return redis.call("EXPIRE", KEYS[1], ARGV[2])
+    else
+      return 0
+    end
+    """
+    return bool(r.eval(script, 1, handle.key, handle.token, ttl_seconds))
+
+
+@contextmanager
+def keep_session_lock(
+    handle: LockHandle,
+    ttl_seconds: int,
+    interval_seconds: float,
+    on_renew: Callable[[], None] | None = None,
+) -> Iterator[None]:
+    """
+    Renew the lock every `interval_seconds` from a background thread while the
+    block runs, so turns longer than the TTL keep exclusive ownership.
+    `on_renew` runs on the same schedule (e.g. to keep a queue claim fresh).
+    """
+    stop = threading.Event()
+
+    def renew_loop():
+        while not stop.wait(interval_seconds):
+            try:
+                if not renew_session_lock(handle, ttl_seconds):
+                    print(f"locks: lost {handle.key} while still running")
+                if on_renew:
+                    on_renew()
+            except Exception as e:
+                print(f"locks: failed to renew {handle.key}: {e}")
+
+    t = threading.Thread(target=renew_loop, name=f"renew:{handle.key}", daemon=True)
+    t.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        t.join()
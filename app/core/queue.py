@@ -1,24 +1,176 @@
 import json
+import os
+import socket
+from collections.abc import Callable
 from typing import Any
 
+import redis
+
+from app.core.config import settings
 from app.core.redis import get_redis
 
-QUEUE_KEY = "jobs:agent"
+QUEUE_KEY = "jobs:agent:stream"
+DEAD_LETTER_KEY = "jobs:agent:dead"
+GROUP = "workers"
+
+# Keys added to a dequeued job; never serialized back into the stream.
+_RESERVED = ("_id", "_deliveries")
 
 
-def enqueue(job: dict[str, Any]) -> None:
-    r = get_redis()
-    r.lpush(QUEUE_KEY, json.dumps(job))
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
 
 
-def dequeue_blocking(timeout_seconds: int = 5) -> dict[str, Any] | None:
+class StreamQueue:
     """
-    BRPOP blocks until an item is available or timeout.
-    Returns job dict or None.
+    At-least-once job queue on a Redis Stream with a consumer group.
+
+    - enqueue: XADD
+    - dequeue: XREADGROUP (new entries); entries left pending by a dead worker
+      for longer than `claim_idle_seconds` are taken over with XAUTOCLAIM
+    - ack: XACK + XDEL once the job is done
+    - entries delivered more than `max_deliveries` times go to a dead-letter
+      stream instead of being retried forever; `on_dead_letter` is then
+      called with the parked job
     """
-    r = get_redis()
-    item = r.brpop(QUEUE_KEY, timeout=timeout_seconds)
-    if not item:
-        return None
-    _, payload = item
-    return json.loads(payload)
+
+    def __init__(
+        self,
+        key: str = QUEUE_KEY,
+        dead_letter_key: str = DEAD_LETTER_KEY,
+        group: str = GROUP,
+        claim_idle_seconds: int | None = None,
+        max_deliveries: int | None = None,
+        on_dead_letter: Callable[[dict[str, Any]], None] | None = None,
+    ):
+        self.key = key
+        self.dead_letter_key = dead_letter_key
+        self.group = group
+        self.claim_idle_ms = 1000 * (
+            claim_idle_seconds
+            if claim_idle_seconds is not None
+            else settings.QUEUE_CLAIM_IDLE_SECONDS
+        )
+        self.max_deliveries = (
+            max_deliveries
+            if max_deliveries is not None
+            else settings.QUEUE_MAX_DELIVERIES
+        )
+        self.on_dead_letter = on_dead_letter
+        self._group_ready = False
+
+    def _ensure_group(self, r: redis.Redis) -> None:
+        if self._group_ready:
+            return
+        try:
+            r.xgroup_create(self.key, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def enqueue(self, job: dict[str, Any]) -> str:
+        r = get_redis()
+        body = {k: v for k, v in job.items() if k not in _RESERVED}
+        return r.xadd(self.key, {"job": json.dumps(body)})
+
+    def dequeue_blocking(
+        self, timeout_seconds: int = 5, consumer: str | None = None
+    ) -> dict[str, Any] | None:
+        """
+        Blocks until a job is available or timeout. Returns the job dict with
+        `_id` (stream entry id, needed for ack) and `_deliveries` added, or None.
+        """
+        r = get_redis()
+        self._ensure_group(r)
+        consumer = consumer or default_consumer_name()
+
+        job = self._reclaim_one(r, consumer)
+        if job is not None:
+            return job
+
+        resp = r.xreadgroup(
+            self.group,
+            consumer,
+            {self.key: ">"},
+            count=1,
+            block=timeout_seconds * 1000,
+        )
+        if not resp:
+            return None
+        _, entries = resp[0]
+        entry_id, fields = entries[0]
+        return self._decode(entry_id, fields, deliveries=1)
+
+    def ack(self, job: dict[str, Any]) -> None:
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.xack(self.key, self.group, job["_id"])
+        pipe.xdel(self.key, job["_id"])
+        pipe.execute()
+
+    def touch(self, job: dict[str, Any], consumer: str | None = None) -> None:
+        """Reset the entry's idle time so long-running jobs are not reclaimed."""
+        r = get_redis()
+        r.xclaim(
+            self.key,
+            self.group,
+            consumer or default_consumer_name(),
+            min_idle_time=0,
+            message_ids=[job["_id"]],
+            justid=True,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        r = get_redis()
+        self._ensure_group(r)
+        pending = r.xpending(self.key, self.group)
+        return {
+            "length": r.xlen(self.key),
+            "pending": pending["pending"],
+            "dead_letters": r.xlen(self.dead_letter_key),
+        }
+
+    def _reclaim_one(self, r: redis.Redis, consumer: str) -> dict[str, Any] | None:
+        while True:
+            _, claimed, _ = r.xautoclaim(
+                self.key,
+                self.group,
+                consumer,
+                min_idle_time=self.claim_idle_ms,
+                start_id="0-0",
+                count=1,
+            )
+            if not claimed:
+                return None
+
+            entry_id, fields = claimed[0]
+            info = r.xpending_range(
+                self.key, self.group, min=entry_id, max=entry_id, count=1
+            )
+            deliveries = info[0]["times_delivered"] if info else 1
+            if deliveries <= self.max_deliveries:
+                return self._decode(entry_id, fields, deliveries=deliveries)
+
+            # poison / repeatedly crashing job: park it and look for another
+            pipe = r.pipeline()
+            pipe.xadd(
+                self.dead_letter_key,
+                {
+                    "job": fields.get("job", ""),
+                    "source_id": entry_id,
+                    "deliveries": deliveries,
+                },
+            )
+            pipe.xack(self.key, self.group, entry_id)
+            pipe.xdel(self.key, entry_id)
+            pipe.execute()
+            if self.on_dead_letter is not None:
+                self.on_dead_letter(self._decode(entry_id, fields, deliveries))
+
+    @staticmethod
+    def _decode(entry_id: str, fields: dict[str, str], deliveries: int):
+        job = json.loads(fields["job"])
+        job["_id"] = entry_id
+        job["_deliveries"] = deliveries
+        return job
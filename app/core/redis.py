@@ -1,7 +1,110 @@
+import threading
+from typing import Any
+
 import redis
+import redis.asyncio as aioredis
 
 from app.core.config import settings
 
 
+class _PoolStats:
+    """Counters shared by the sync and async pools below."""
+
+    def _init_stats(self) -> None:
+        self._stats_lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        self.waits = 0  # acquisitions that found every connection checked out
+
+    def _count(self, field: str, delta: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max": self.max_connections,
+            "created": self.created,
+            "in_use": self.in_use,
+            "waits": self.waits,
+        }
+
+
+class InstrumentedPool(_PoolStats, redis.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_stats()
+
+    def make_connection(self):
+        self._count("created")
+        return super().make_connection()
+
+    def get_connection(self, *args, **kwargs):
+        if self.pool.empty():
+            self._count("waits")
+        conn = super().get_connection(*args, **kwargs)
+        self._count("in_use")
+        return conn
+
+    def release(self, connection) -> None:
+        self._count("in_use", -1)
+        super().release(connection)
+
+
+class InstrumentedAsyncPool(_PoolStats, aioredis.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._init_stats()
+
+    def make_connection(self):
+        self._count("created")
+        return super().make_connection()
+
+    async def get_connection(self, *args, **kwargs):
+        if not self.can_get_connection():
+            self._count("waits")
+        conn = await super().get_connection(*args, **kwargs)
+        self._count("in_use")
+        return conn
+
+    async def release(self, connection) -> None:
+        self._count("in_use", -1)
+        await super().release(connection)
+
+
+_pool = InstrumentedPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+)
+_client = redis.Redis(connection_pool=_pool)
+_async_client: aioredis.Redis | None = None
+
+
 def get_redis() -> redis.Redis:
-    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    """Process-wide client on a shared, bounded connection pool."""
+    return _client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Process-wide asyncio client. Bound to the event loop that first uses it;
+    in the API that is uvicorn's loop.
+    """
+    global _async_client
+    if _async_client is None:
+        pool = InstrumentedAsyncPool.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+        )
+        _async_client = aioredis.Redis(connection_pool=pool)
+    return _async_client
+
+
+def pool_stats() -> dict[str, Any]:
+    out = {"sync": _pool.stats()}
+    if _async_client is not None:
+        out["async"] = _async_client.connection_pool.stats()
+    return out
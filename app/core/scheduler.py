@@ -0,0 +1,192 @@
+import json
+from typing import Any
+
+from app.core.queue import StreamQueue
+from app.core.redis import get_redis
+
+# Per-session FIFO dispatch.
+#
+# Jobs are appended to a per-session list. The shared stream (StreamQueue)
+# carries *session tokens*, not jobs: a session has at most one token in
+# flight, guarded by the `scheduled` flag. A worker that dequeues a token owns
+# the session and drains its list in order, so a busy session never blocks
+# other sessions' jobs and a session's messages are never reordered.
+
+# Push the job; schedule the session only if it is not already scheduled.
+_SUBMIT_SCRIPT = """
+redis.call("RPUSH", KEYS[1], ARGV[1])
+if redis.call("SET", KEYS[2], "1", "NX") then
+  redis.call("XADD", KEYS[3], "*", "job", ARGV[2])
+  return 1
+end
+return 0
+"""
+
+# Give the session up only if nothing was submitted in the meantime.
+_RELEASE_SCRIPT = """
+if redis.call("LLEN", KEYS[1]) == 0 then
+  redis.call("DEL", KEYS[2])
+  return 1
+end
+return 0
+"""
+
+# Head job plus the number of times it was started; only a crash leaves a
+# started job at the head, so the count grows with crashes on that job.
+_START_SCRIPT = """
+local job = redis.call("LINDEX", KEYS[1], 0)
+if not job then
+  return nil
+end
+return {job, redis.call("INCR", KEYS[2])}
+"""
+
+# Move the head job to the dead-letter stream.
+_DROP_SCRIPT = """
+local job = redis.call("LPOP", KEYS[1])
+redis.call("DEL", KEYS[2])
+if job then
+  redis.call("XADD", KEYS[3], "*", "job", job)
+end
+return job
+"""
+
+# A session's token was dead-lettered (its claims kept dying): park the head
+# job too, then reschedule the session if more jobs wait, else unschedule it.
+_DEAD_LETTER_SCRIPT = """
+local job = redis.call("LPOP", KEYS[1])
+redis.call("DEL", KEYS[5])
+if job then
+  redis.call("XADD", KEYS[4], "*", "job", job)
+end
+if redis.call("LLEN", KEYS[1]) > 0 then
+  redis.call("XADD", KEYS[3], "*", "job", ARGV[1])
+else
+  redis.call("DEL", KEYS[2])
+end
+return job
+"""
+
+
+def _jobs_key(session_id: str) -> str:
+    return f"jobs:session:{session_id}"
+
+
+def _scheduled_key(session_id: str) -> str:
+    return f"jobs:session:{session_id}:scheduled"
+
+
+def _attempts_key(session_id: str) -> str:
+    return f"jobs:session:{session_id}:attempts"
+
+
+def _session_dead_lettered(token: dict[str, Any]) -> None:
+    session_id = token["session_id"]
+    r = get_redis()
+    job = r.eval(
+        _DEAD_LETTER_SCRIPT,
+        5,
+        _jobs_key(session_id),
+        _scheduled_key(session_id),
+        sessions_queue.key,
+        sessions_queue.dead_letter_key,
+        _attempts_key(session_id),
+        json.dumps({"session_id": session_id}),
+    )
+    print(f"scheduler: session {session_id} dead-lettered, dropped job {job}")
+
+
+sessions_queue = StreamQueue(on_dead_letter=_session_dead_lettered)
+
+
+def enqueue(job: dict[str, Any]) -> bool:
+    """
+    Append a job to its session's FIFO. Returns True if this made the session
+    runnable (a token was added to the shared stream).
+    """
+    session_id = job["session_id"]
+    r = get_redis()
+    return bool(
+        r.eval(
+            _SUBMIT_SCRIPT,
+            3,
+            _jobs_key(session_id),
+            _scheduled_key(session_id),
+            sessions_queue.key,
+            json.dumps(job),
+            json.dumps({"session_id": session_id}),
+        )
+    )
+
+
+def claim_session(timeout_seconds: int = 5) -> dict[str, Any] | None:
+    """Block until a runnable session is available; returns its claim token."""
+    return sessions_queue.dequeue_blocking(timeout_seconds=timeout_seconds)
+
+
+def touch_claim(claim: dict[str, Any]) -> None:
+    """Keep a long-running claim from being reclaimed as abandoned."""
+    sessions_queue.touch(claim)
+
+
+def start_job(session_id: str) -> tuple[dict[str, Any], int] | None:
+    """
+    Head of the session's FIFO and how many times it has been started, this
+    time included. The job stays in the list until `complete_job`, so a
+    worker crash mid-turn does not lose it (and counts against it).
+    """
+    r = get_redis()
+    head = r.eval(_START_SCRIPT, 2, _jobs_key(session_id), _attempts_key(session_id))
+    if not head:
+        return None
+    return json.loads(head[0]), int(head[1])
+
+
+def complete_job(session_id: str) -> None:
+    r = get_redis()
+    pipe = r.pipeline()
+    pipe.lpop(_jobs_key(session_id))
+    pipe.delete(_attempts_key(session_id))
+    pipe.execute()
+
+
+def drop_job(session_id: str) -> dict[str, Any] | None:
+    """Move the head job to the dead-letter stream; returns it."""
+    r = get_redis()
+    job = r.eval(
+        _DROP_SCRIPT,
+        3,
+        _jobs_key(session_id),
+        _attempts_key(session_id),
+        sessions_queue.dead_letter_key,
+    )
+    return json.loads(job) if job else None
+
+
+def release_session(claim: dict[str, Any]) -> bool:
+    """
+    Finish the claim if the session's FIFO is empty. Returns False when jobs
+    arrived in the meantime; the caller keeps draining.
+    """
+    session_id = claim["session_id"]
+    r = get_redis()
+    released = r.eval(
+        _RELEASE_SCRIPT, 2, _jobs_key(session_id), _scheduled_key(session_id)
+    )
+    if released:
+        sessions_queue.ack(claim)
+    return bool(released)
+
+
+def yield_session(claim: dict[str, Any]) -> None:
+    """
+    Send a still-busy session to the back of the line (fairness): re-add its
+    token, keeping the `scheduled` flag, and ack the current one.
+    """
+    sessions_queue.enqueue({"session_id": claim["session_id"]})
+    sessions_queue.ack(claim)
+
+
+def pending_jobs(session_id: str) -> int:
+    r = get_redis()
+    return r.llen(_jobs_key(session_id))
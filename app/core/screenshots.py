@@ -0,0 +1,91 @@
+import base64
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Protocol
+
+from app.core.config import settings
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobBackend(Protocol):
+    def exists(self, key: str) -> bool: ...
+
+    def put(self, key: str, data: bytes) -> None: ...
+
+    def get(self, key: str) -> bytes | None: ...
+
+
+class LocalBlobBackend:
+    """Files under `root`, fanned out by hash prefix (ab/cd/abcd...)."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / key
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+BACKENDS: dict[str, type] = {"local": LocalBlobBackend}
+
+
+class ScreenshotStore:
+    """
+    Screenshots keyed by the SHA-256 of their bytes. Identical frames are
+    stored once; events carry the hash and a URL instead of the image.
+    """
+
+    def __init__(self, backend: BlobBackend):
+        self.backend = backend
+
+    def put(self, data: bytes) -> str:
+        key = hashlib.sha256(data).hexdigest()
+        if not self.backend.exists(key):
+            self.backend.put(key, data)
+        return key
+
+    def put_b64(self, image_b64: str) -> str:
+        return self.put(base64.b64decode(image_b64))
+
+    def get(self, key: str) -> bytes | None:
+        if not is_screenshot_hash(key):
+            return None
+        return self.backend.get(key)
+
+
+def is_screenshot_hash(key: str) -> bool:
+    return bool(_HASH_RE.match(key))
+
+
+def screenshot_url(key: str) -> str:
+    return f"/v1/screenshots/{key}"
+
+
+screenshot_store = ScreenshotStore(
+    BACKENDS[settings.SCREENSHOT_BACKEND](settings.SCREENSHOT_DIR)
+)
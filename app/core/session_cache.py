@@ -0,0 +1,271 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_redis
+from app.models.session import Session as SessionModel
+
+# "<origin>:<session id>" after every write; other API processes drop their copy
+INVALIDATE_CHANNEL = "sessions:invalidate"
+
+# what the API returns for a session (SessionOut)
+STATE_FIELDS = (
+    "id",
+    "status",
+    "novnc_url",
+    "vnc_host",
+    "vnc_port",
+    "last_error",
+    "created_at",
+    "updated_at",
+)
+
+
+def state_key(session_id) -> str:
+    return f"sessions:{session_id}:state"
+
+
+def session_state(s: SessionModel) -> dict[str, Any]:
+    state = {f: getattr(s, f) for f in STATE_FIELDS}
+    state["id"] = str(s.id)
+    for f in ("created_at", "updated_at"):
+        state[f] = state[f].isoformat() if state[f] else None
+    return state
+
+
+class SessionStateCache:
+    """
+    Status and VNC info of sessions, for status polls and message posts.
+
+    Redis holds the shared copy; each API process also keeps an LRU of the
+    sessions it served, used only while subscribed to INVALIDATE_CHANNEL.
+    Every status transition (API or worker) writes the new state through
+    after the DB commit and publishes an invalidation. Misses are read from
+    the DB and filled with SET NX, so they never overwrite a newer write.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        ttl_seconds: int,
+        local_size: int,
+        local_ttl_seconds: float,
+    ):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.local_size = local_size
+        self.local_ttl_seconds = local_ttl_seconds
+        self._origin = uuid.uuid4().hex
+        self._local: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()  # puts come from worker / threadpool threads
+        self._subscribed = False
+        self._task: asyncio.Task | None = None
+        self._counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "invalidations": 0,
+            "errors": 0,
+        }
+
+    async def start(self) -> None:
+        if self.enabled and self.local_size > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def get(self, session_id) -> dict[str, Any] | None:
+        """Cached state, or None (not cached, or Redis unavailable)."""
+        if not self.enabled:
+            return None
+        key = str(session_id)
+        state = self._local_get(key)
+        if state is not None:
+            self._count("local_hits")
+            return state
+        try:
+            raw = await get_async_redis().get(state_key(key))
+        except Exception as e:
+            print(f"session cache: redis read failed: {e}")
+            self._count("errors")
+            raw = None
+        if raw is None:
+            self._count("misses")
+            return None
+        self._count("redis_hits")
+        state = json.loads(raw)
+        self._local_put(key, state)
+        return state
+
+    async def load(self, db: AsyncSession, session_id) -> dict[str, Any] | None:
+        """Cached state, else read from the DB and cached; None if not found."""
+        state = await self.get(session_id)
+        if state is None:
+            s = await db.get(SessionModel, session_id)
+            if s is None:
+                return None
+            state = await self.fill(s)
+        return state
+
+    async def fill(self, s: SessionModel) -> dict[str, Any]:
+        """Cache a state read from the DB, unless a write got there first."""
+        state = session_state(s)
+        if not self.enabled:
+            return state
+        try:
+            stored = await get_async_redis().set(
+                state_key(state["id"]),
+                json.dumps(state),
+                ex=self.ttl_seconds,
+                nx=True,
+            )
+        except Exception as e:
+            print(f"session cache: redis fill failed: {e}")
+            self._count("errors")
+            return state
+        if stored:
+            self._local_put(state["id"], state)
+        return state
+
+    def put(self, s: SessionModel) -> None:
+        """Write-through after a committed status change (sync callers)."""
+        if not self.enabled:
+            return
+        state = session_state(s)
+        pipe = get_redis().pipeline(transaction=False)
+        self._write(pipe, state)
+        try:
+            pipe.execute()
+        except Exception as e:
+            # a stale Redis copy expires after SESSION_CACHE_TTL_SECONDS
+            print(f"session cache: write-through failed: {e}")
+            self._count("errors")
+            self._local_drop(state["id"])
+            return
+        self._wrote(state)
+
+    async def aput(self, s: SessionModel) -> None:
+        """put() for the API's event loop."""
+        if not self.enabled:
+            return
+        state = session_state(s)
+        pipe = get_async_redis().pipeline(transaction=False)
+        self._write(pipe, state)
+        try:
+            await pipe.execute()
+        except Exception as e:
+            print(f"session cache: write-through failed: {e}")
+            self._count("errors")
+            self._local_drop(state["id"])
+            return
+        self._wrote(state)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            c = dict(self._counters)
+            local = len(self._local)
+        hits = c["local_hits"] + c["redis_hits"]
+        total = hits + c["misses"]
+        return {
+            "enabled": self.enabled,
+            "subscribed": self._subscribed,
+            "local_entries": local,
+            **c,
+            "hit_rate": round(hits / total, 3) if total else None,
+        }
+
+    def _write(self, pipe, state: dict[str, Any]) -> None:
+        pipe.set(state_key(state["id"]), json.dumps(state), ex=self.ttl_seconds)
+        pipe.publish(INVALIDATE_CHANNEL, f"{self._origin}:{state['id']}")
+
+    def _wrote(self, state: dict[str, Any]) -> None:
+        self._count("writes")
+        self._local_put(state["id"], state)
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._counters[field] += 1
+
+    def _local_get(self, key: str) -> dict[str, Any] | None:
+        if not self._subscribed:
+            return None
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry[1]
+
+    def _local_put(self, key: str, state: dict[str, Any]) -> None:
+        if not self._subscribed:
+            return
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl_seconds, state)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def _local_drop(self, key: str) -> None:
+        with self._lock:
+            self._local.pop(key, None)
+
+    def _local_clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        while True:
+            # holds one connection of the shared async pool while subscribed
+            pubsub = get_async_redis().pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                self._subscribed = True
+                backoff = 0.5
+                async for msg in pubsub.listen():
+                    if msg["type"] != "message":
+                        continue
+                    origin, _, session_id = msg["data"].partition(":")
+                    if origin != self._origin:
+                        self._local_drop(session_id)
+                        self._count("invalidations")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"session cache: redis subscription failed: {e}")
+            finally:
+                # invalidations may be missed until subscribed again
+                self._subscribed = False
+                self._local_clear()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+
+session_cache = SessionStateCache(
+    enabled=settings.SESSION_CACHE_ENABLED,
+    ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+    local_size=settings.SESSION_CACHE_LOCAL_SIZE,
+    local_ttl_seconds=settings.SESSION_CACHE_LOCAL_TTL_SECONDS,
+)
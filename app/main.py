@@ -1,18 +1,48 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
 from app.api.health import router as health_router
 from app.api.history import router as history_router
 from app.api.messages import router as messages_router
+from app.api.screenshots import router as screenshots_router
 from app.api.sessions import router as sessions_router
 from app.api.streaming import router as streaming_router
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.event_partitions import ensure_partitions
+from app.core.events import event_sink
+from app.core.hub import event_hub
+from app.core.session_cache import session_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the API stores events too; the worker may not have run yet
+    try:
+        await asyncio.to_thread(ensure_partitions, settings.EVENT_PARTITIONS_AHEAD_DAYS)
+    except Exception as e:
+        print(f"events: creating partitions failed: {e}")
+    await event_hub.start()
+    await session_cache.start()
+    try:
+        yield
+    finally:
+        await session_cache.stop()
+        await event_hub.stop()
+        event_sink.close()
+        await async_engine.dispose()
+
 
-app = FastAPI(title="Computer Use Backend")
+app = FastAPI(title="Computer Use Backend", lifespan=lifespan)
 
 app.include_router(health_router)
 app.include_router(sessions_router)
 app.include_router(streaming_router)
 app.include_router(messages_router)
 app.include_router(history_router)
+app.include_router(screenshots_router)
 
 app.mount("/", StaticFiles(directory="frontend", html=True), name="frontend")
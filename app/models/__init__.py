@@ -1,5 +1,6 @@
+from .conversation import ConversationMessage
 from .event import Event
 from .message import Message
 from .session import Session
 
-__all__ = ["Session", "Message", "Event"]
+__all__ = ["Session", "Message", "Event", "ConversationMessage"]
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db import Base
+
+
+class ConversationMessage(Base):
+    """
+    One message of the agent conversation as sent to the model (content
+    blocks incl. tool_use / tool_result), in order. Images are stored as
+    screenshot hash references, not base64.
+    """
+
+    __tablename__ = "conversation_messages"
+    __table_args__ = (
+        UniqueConstraint(
+            "session_id", "position", name="uq_conversation_messages_session_position"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    session_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("sessions.id", ondelete="CASCADE")
+    )
+    position: Mapped[int] = mapped_column(Integer)  # 0-based, per session
+
+    role: Mapped[str] = mapped_column(String(16))  # user/assistant
+    content: Mapped[list] = mapped_column(JSONB)
+    # model usage of the response that produced an assistant message
+    usage: Mapped[dict | None] = mapped_column(JSONB, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
@@ -1,26 +1,43 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.db import Base
+from app.core.ids import uuid7
 
 
 class Event(Base):
+    """
+    Range-partitioned by `created_at`, one partition per UTC day (see
+    app/core/event_partitions.py); the partition key is part of the PK.
+    """
+
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_session_id_seq", "session_id", "seq"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, default=uuid7
     )
     session_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("sessions.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("sessions.id", ondelete="CASCADE")
     )
+    # per-session monotonic sequence number (SSE `id:`), assigned in Redis
+    seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # coalesced rows: seq of the first merged event (the row covers
+    # first_seq..seq); NULL for a single event
+    first_seq: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     type: Mapped[str] = mapped_column(String(64), index=True)
     payload: Mapped[dict] = mapped_column(JSONB)
 
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.now(timezone.utc)
+        DateTime(timezone=True),
+        primary_key=True,
+        default=lambda: datetime.now(timezone.utc),
     )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -10,10 +10,12 @@ from app.core.db import Base
 
 class Message(Base):
     __tablename__ = "messages"
+    # history pages: keyset on id within a session
+    __table_args__ = (Index("ix_messages_session_id_id", "session_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     session_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("sessions.id", ondelete="CASCADE"), index=True
+        UUID(as_uuid=True), ForeignKey("sessions.id", ondelete="CASCADE")
     )
 
     role: Mapped[str] = mapped_column(
@@ -22,5 +24,5 @@ class Message(Base):
     content: Mapped[str] = mapped_column(Text)
 
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.now(timezone.utc)
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
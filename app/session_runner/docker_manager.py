@@ -1,8 +1,12 @@
 from dataclasses import dataclass
 
+from docker.errors import ImageNotFound
+
 import docker
 from app.core.config import settings
 
+LABELS = {"app": "computer-use-backend"}
+
 
 @dataclass
 class VmInfo:
@@ -12,16 +16,53 @@ class VmInfo:
     novnc_url: str
 
 
+def session_container_name(session_id: str) -> str:
+    return f"computeruse-session-{session_id}"
+
+
+def make_docker_client():
+    """Docker Engine via /var/run/docker.sock, or the in-memory fake."""
+    if settings.DOCKER_CLIENT == "fake":
+        from app.session_runner.fake_docker import FakeDockerClient
+
+        return FakeDockerClient()
+    return docker.from_env()
+
+
 class DockerSessionManager:
     """
     Creates one computer-use-demo container per session.
     Uses Docker Engine via /var/run/docker.sock.
     """
 
-    def __init__(self):
-        self.client = docker.from_env()
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        # created on first use, so importing the API needs no daemon
+        if self._client is None:
+            self._client = make_docker_client()
+        return self._client
+
+    def has_image(self) -> bool:
+        try:
+            self.client.images.get(settings.COMPUTER_USE_IMAGE)
+            return True
+        except ImageNotFound:
+            return False
+
+    def pull_image(self) -> None:
+        self.client.images.pull(settings.COMPUTER_USE_IMAGE)
 
     def start(self, session_id: str) -> VmInfo:
+        container = self.run_container(
+            name=session_container_name(session_id),
+            labels={"session_id": session_id},
+        )
+        return self.vm_info(container)
+
+    def run_container(self, name: str, labels: dict[str, str]):
         image = settings.COMPUTER_USE_IMAGE
 
         # Map container ports to random host ports (None => docker assigns)
@@ -37,19 +78,17 @@ class DockerSessionManager:
             "ANTHROPIC_API_KEY": "",  # optional here; you can wire it later safely
         }
 
-        container = self.client.containers.run(
+        return self.client.containers.run(
             image=image,
             detach=True,
-            name=f"computeruse-session-{session_id}",
+            name=name,
             ports=ports,
             environment=env,
             shm_size="1g",
-            labels={
-                "app": "computer-use-backend",
-                "session_id": session_id,
-            },
+            labels={**LABELS, **labels},
         )
 
+    def vm_info(self, container) -> VmInfo:
         container.reload()
         portmap = container.attrs["NetworkSettings"]["Ports"]
 
@@ -70,6 +109,8 @@ class DockerSessionManager:
     def stop(self, container_id: str) -> None:
         c = self.client.containers.get(container_id)
         try:
+            if c.status == "paused":
+                c.unpause()  # idle-paused desktops must resume before a stop
             c.stop(timeout=5)
         finally:
             # remove container to avoid buildup
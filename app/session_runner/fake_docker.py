@@ -0,0 +1,139 @@
+"""
+In-memory stand-in for the parts of docker-py that DockerSessionManager and
+the warm pool use. Select it with DOCKER_CLIENT=fake to run the API, worker
+or benchmarks without a Docker daemon.
+"""
+
+import itertools
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from docker.errors import APIError, ImageNotFound, NotFound
+
+
+class FakeContainer:
+    def __init__(self, client: "FakeDockerClient", name: str, labels, ports):
+        self._client = client
+        self.id = uuid.uuid4().hex + uuid.uuid4().hex
+        self.name = name
+        self.labels = dict(labels or {})
+        self.status = "running"
+        self.attrs = {
+            "Created": datetime.now(timezone.utc).isoformat(),
+            "Config": {"Labels": self.labels},
+            "NetworkSettings": {
+                "Ports": {
+                    port: [{"HostIp": "0.0.0.0", "HostPort": str(client.next_port())}]
+                    for port in (ports or {})
+                }
+            },
+        }
+
+    def reload(self) -> None:
+        if self.id not in self._client.containers._by_id:
+            raise NotFound(f"No such container: {self.id}")
+
+    def rename(self, name: str) -> None:
+        self._client.containers._rename(self, name)
+
+    def pause(self) -> None:
+        self.status = "paused"
+
+    def unpause(self) -> None:
+        self.status = "running"
+
+    def stop(self, timeout: int = 10) -> None:
+        self.status = "exited"
+
+    def remove(self, force: bool = False) -> None:
+        if self.status == "running" and not force:
+            raise APIError("You cannot remove a running container")
+        self._client.containers._remove(self)
+
+
+class FakeContainers:
+    def __init__(self, client: "FakeDockerClient", start_seconds: float):
+        self._client = client
+        self._start_seconds = start_seconds
+        self._lock = threading.Lock()
+        self._by_id: dict[str, FakeContainer] = {}
+
+    def run(self, image: str, name: str | None = None, ports=None, labels=None, **_):
+        # simulated image start; real runs take seconds
+        time.sleep(self._start_seconds)
+        name = name or f"fake-{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            if any(c.name == name for c in self._by_id.values()):
+                raise APIError(f"Conflict. The container name {name!r} is in use")
+            c = FakeContainer(self._client, name, labels, ports)
+            self._by_id[c.id] = c
+        return c
+
+    def get(self, container_id: str) -> FakeContainer:
+        with self._lock:
+            for c in self._by_id.values():
+                if container_id in (c.id, c.name) or c.id.startswith(container_id):
+                    return c
+        raise NotFound(f"No such container: {container_id}")
+
+    def list(self, all: bool = False, filters: dict | None = None):
+        labels = (filters or {}).get("label", [])
+        if isinstance(labels, str):
+            labels = [labels]
+        with self._lock:
+            out = list(self._by_id.values())
+        if not all:
+            out = [c for c in out if c.status == "running"]
+        for f in labels:
+            k, _, v = f.partition("=")
+            out = [c for c in out if k in c.labels and (not v or c.labels[k] == v)]
+        return out
+
+    def _rename(self, container: FakeContainer, name: str) -> None:
+        with self._lock:
+            if any(c.name == name for c in self._by_id.values()):
+                raise APIError(f"Conflict. The container name {name!r} is in use")
+            container.name = name
+
+    def _remove(self, container: FakeContainer) -> None:
+        with self._lock:
+            self._by_id.pop(container.id, None)
+
+
+class FakeImages:
+    def __init__(self, pull_seconds: float, present: bool):
+        self._pull_seconds = pull_seconds
+        self._present = present
+
+    def get(self, name: str):
+        if not self._present:
+            raise ImageNotFound(f"No such image: {name}")
+        return name
+
+    def pull(self, name: str):
+        time.sleep(self._pull_seconds)
+        self._present = True
+        return name
+
+
+class FakeDockerClient:
+    def __init__(
+        self,
+        start_seconds: float = 0.0,
+        pull_seconds: float = 0.0,
+        image_present: bool = True,
+    ):
+        self._ports = itertools.count(32768)
+        self.containers = FakeContainers(self, start_seconds)
+        self.images = FakeImages(pull_seconds, image_present)
+
+    def next_port(self) -> int:
+        return next(self._ports)
+
+    def ping(self) -> bool:
+        return True
+
+    def info(self) -> dict:
+        return {"MemTotal": 16 * 1024**3}
@@ -0,0 +1,265 @@
+import threading
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.events import event_sink, publish_event
+from app.core.locks import acquire_lock, acquire_session_lock, release_session_lock
+from app.core.redis import get_redis
+from app.core.scheduler import pending_jobs
+from app.core.session_cache import session_cache
+from app.models.session import Session as SessionModel
+from app.session_runner.docker_manager import LABELS, DockerSessionManager
+from app.session_runner.pool import POOL_NAME_PREFIX, vm_pool
+
+ACTIVITY_KEY = "vm:activity"  # zset: session id -> last activity (unix time)
+STATS_KEY = "vm:lifecycle:stats"
+
+# sessions that own a desktop container
+LIVE_STATUSES = ("idle", "running", "paused")
+
+
+def touch_activity(session_id) -> None:
+    """Record user-driven activity (message, turn, provisioning)."""
+    get_redis().zadd(ACTIVITY_KEY, {str(session_id): time.time()})
+
+
+def forget_activity(session_id) -> None:
+    get_redis().zrem(ACTIVITY_KEY, str(session_id))
+
+
+class LifecycleManager:
+    """
+    Reclaims desktops from abandoned sessions. A session idle (no messages or
+    turns) for `pause_after` seconds has its container paused - no CPU, memory
+    kept, resumed on the next message; after `stop_after` the container is
+    removed and the session stopped. An open browser tab alone does not count
+    as activity.
+
+    Runs in the worker; one process per interval does the work (Redis lock).
+    On start it reconciles the DB against containers labelled
+    app=computer-use-backend, in both directions.
+    """
+
+    def __init__(
+        self,
+        manager: DockerSessionManager,
+        pause_after: int,
+        stop_after: int,
+        interval_seconds: float = 30.0,
+    ):
+        self.manager = manager
+        self.pause_after = pause_after
+        self.stop_after = stop_after
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._mem_bytes: int | None = None  # docker host RAM
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="vm-lifecycle", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def resume(self, session: SessionModel) -> None:
+        """Unpause a paused session's container before running a turn."""
+        c = self.manager.client.containers.get(session.vm_container_id)
+        if c.status == "paused":
+            c.unpause()
+
+    def reap(self) -> dict[str, int]:
+        """Pause, then stop, sessions idle past their thresholds."""
+        r = get_redis()
+        now = time.time()
+        threshold = self.pause_after if self.pause_after > 0 else self.stop_after
+        if threshold <= 0:
+            return {"paused": 0, "stopped": 0}
+        idle = r.zrangebyscore(ACTIVITY_KEY, "-inf", now - threshold, withscores=True)
+
+        out = {"paused": 0, "stopped": 0}
+        for session_id, last in idle:
+            if pending_jobs(session_id):
+                continue  # about to run; the turn touches activity again
+            lock = acquire_session_lock(session_id, ttl_seconds=60)
+            if not lock:
+                continue  # a turn is in progress
+            try:
+                action = self._reap_one(session_id, now - last)
+                if action:
+                    out[action] += 1
+            except Exception as e:
+                print(f"lifecycle: failed to reap session {session_id}: {e}")
+            finally:
+                release_session_lock(lock)
+        return out
+
+    def reconcile(self) -> dict[str, int]:
+        """
+        Remove containers whose session is gone or finished, and fail live
+        sessions whose container is gone.
+        """
+        containers = self._session_containers()
+        by_id = {c.id: c for c in containers}
+        out = {"orphan_containers": 0, "lost_vms": 0}
+
+        db = SessionLocal()
+        try:
+            live = (
+                db.execute(
+                    select(SessionModel).where(SessionModel.status.in_(LIVE_STATUSES))
+                )
+                .scalars()
+                .all()
+            )
+            owned = {s.vm_container_id for s in live}
+
+            for c in containers:
+                if c.id in owned:
+                    continue
+                s = self._session_for(db, c.name)
+                if s and s.status == "creating":
+                    continue  # being provisioned right now
+                print(f"lifecycle: removing orphan container {c.name}")
+                self._remove(c.id)
+                out["orphan_containers"] += 1
+
+            for s in live:
+                c = by_id.get(s.vm_container_id)
+                if c is None or c.status not in ("running", "paused"):
+                    print(f"lifecycle: session {s.id} lost its VM")
+                    self._set_status(db, s, "failed", error="VM container lost")
+                    forget_activity(s.id)
+                    out["lost_vms"] += 1
+                    continue
+                if c.status == "paused" and s.status == "idle":
+                    self._set_status(db, s, "paused")
+                # sessions from before activity tracking start their clock now
+                get_redis().zadd(ACTIVITY_KEY, {str(s.id): time.time()}, nx=True)
+        finally:
+            event_sink.flush()
+            db.close()
+        return out
+
+    def density(self) -> dict[str, Any]:
+        """Desktops holding host memory (running + paused) per GB of RAM."""
+        counts = {"running": 0, "paused": 0}
+        for c in self._session_containers():
+            if c.status in counts:
+                counts[c.status] += 1
+        if self._mem_bytes is None:
+            self._mem_bytes = int(self.manager.client.info().get("MemTotal", 0))
+        gb = self._mem_bytes / 1024**3
+        live = counts["running"] + counts["paused"]
+        return {
+            **counts,
+            "host_mem_gb": round(gb, 1),
+            "desktops_per_gb": round(live / gb, 3) if gb else None,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        st = get_redis().hgetall(STATS_KEY)
+        return {k: float(v) if "." in v else int(v) for k, v in st.items()}
+
+    def _reap_one(self, session_id: str, idle_for: float) -> str | None:
+        db = SessionLocal()
+        try:
+            s = db.get(SessionModel, session_id)
+            if not s or s.status not in ("idle", "paused") or not s.vm_container_id:
+                if not s or s.status in ("stopped", "failed"):
+                    forget_activity(session_id)
+                return None
+
+            if self.stop_after > 0 and idle_for >= self.stop_after:
+                self._remove(s.vm_container_id)
+                self._set_status(db, s, "stopped")
+                forget_activity(session_id)
+                return "stopped"
+
+            if s.status == "idle" and self.pause_after > 0:
+                self.manager.client.containers.get(s.vm_container_id).pause()
+                self._set_status(db, s, "paused")
+                return "paused"
+            return None
+        finally:
+            event_sink.flush()
+            db.close()
+
+    @staticmethod
+    def _session_for(db, container_name: str) -> SessionModel | None:
+        try:
+            session_id = uuid.UUID(container_name.removeprefix("computeruse-session-"))
+        except ValueError:
+            return None
+        return db.get(SessionModel, session_id)
+
+    def _set_status(
+        self, db, s: SessionModel, status: str, error: str | None = None
+    ) -> None:
+        s.status = status
+        payload = {"status": status}
+        if error:
+            s.last_error = error
+            payload["error"] = error
+        db.commit()
+        session_cache.put(s)
+        publish_event(db=db, session_id=s.id, event_type="status", payload=payload)
+
+    def _session_containers(self) -> list:
+        containers = self.manager.client.containers.list(
+            all=True, filters={"label": f"app={LABELS['app']}"}
+        )
+        # idle pool containers belong to the warm pool
+        return [c for c in containers if not c.name.startswith(POOL_NAME_PREFIX)]
+
+    def _remove(self, container_id: str) -> None:
+        try:
+            self.manager.stop(container_id)
+        except Exception as e:
+            print(f"lifecycle: failed to remove {container_id[:12]}: {e}")
+
+    def _run(self) -> None:
+        if acquire_lock("lock:lifecycle:reconcile", ttl_seconds=60):
+            try:
+                print(f"lifecycle: reconciled {self.reconcile()}")
+            except Exception as e:
+                print(f"lifecycle: reconcile failed: {e}")
+
+        while not self._stop.wait(self.interval_seconds):
+            # once per interval across all worker processes; the lock expires
+            # instead of being released
+            if not acquire_lock(
+                "lock:lifecycle", ttl_seconds=max(1, int(self.interval_seconds))
+            ):
+                continue
+            try:
+                reaped = self.reap()
+                pipe = get_redis().pipeline()
+                pipe.hincrby(STATS_KEY, "paused_total", reaped["paused"])
+                pipe.hincrby(STATS_KEY, "stopped_total", reaped["stopped"])
+                density = {k: v for k, v in self.density().items() if v is not None}
+                pipe.hset(STATS_KEY, mapping=density)
+                pipe.execute()
+            except Exception as e:
+                print(f"lifecycle: reap failed: {e}")
+
+
+lifecycle = LifecycleManager(
+    manager=vm_pool.manager,
+    pause_after=settings.SESSION_PAUSE_AFTER_SECONDS,
+    stop_after=settings.SESSION_STOP_AFTER_SECONDS,
+    interval_seconds=settings.REAPER_INTERVAL_SECONDS,
+)
@@ -0,0 +1,274 @@
+import json
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import asdict
+from typing import Any
+
+from docker.errors import APIError, NotFound
+
+from app.core.config import settings
+from app.core.locks import acquire_lock, release_session_lock, renew_session_lock
+from app.core.redis import get_redis
+from app.session_runner.docker_manager import (
+    DockerSessionManager,
+    VmInfo,
+    session_container_name,
+)
+
+POOL_NAME_PREFIX = "computeruse-pool-"
+
+# Pop an idle container together with its connection info.
+_CLAIM_SCRIPT = """
+local cid = redis.call("SPOP", KEYS[1])
+if not cid then
+  return nil
+end
+local info = redis.call("HGET", KEYS[2], cid)
+redis.call("HDEL", KEYS[2], cid)
+return {cid, info}
+"""
+
+
+class WarmPool:
+    """
+    Idle desktop containers started ahead of time, so creating a session is a
+    claim instead of a `containers.run`.
+
+    The idle set lives in Redis, so a container is handed to exactly one
+    session even with several API processes (SPOP). Docker labels are fixed at
+    create time, so a claimed container is marked by renaming it to the
+    session's container name. One process at a time refills and health-checks
+    the pool (Redis lock); idle containers survive restarts and are reused.
+    Counters and latency samples are kept in Redis too, so any process can
+    report them.
+    """
+
+    def __init__(
+        self,
+        manager: DockerSessionManager,
+        target_size: int,
+        max_size: int,
+        refill_seconds: float = 5.0,
+        healthcheck_seconds: float = 30.0,
+        key_prefix: str = "vm:pool",
+    ):
+        self.manager = manager
+        self.target_size = target_size
+        self.max_size = max(max_size, target_size)
+        self.refill_seconds = refill_seconds
+        self.healthcheck_seconds = healthcheck_seconds
+        self.idle_key = f"{key_prefix}:idle"  # set of container ids
+        self.info_key = f"{key_prefix}:info"  # container id -> VmInfo json
+        self.lock_key = f"{key_prefix}:refill"
+        self.stats_key = f"{key_prefix}:stats"  # hits, misses, warmed, discarded
+        self.latency_key = f"{key_prefix}:latency_ms"  # recent acquisitions
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self.target_size <= 0 or self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vm-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def acquire(
+        self, session_id: str, on_progress: Callable[[str], None] | None = None
+    ) -> VmInfo:
+        """
+        VM for a new session: its container if a previous try of the job
+        already made one, a pooled container if one is idle, otherwise a
+        cold start. `on_progress` is told about the slow steps of a cold start
+        ("pulling" if the image is missing, then "starting").
+        """
+        progress = on_progress or (lambda stage: None)
+        t0 = time.perf_counter()
+        vm = self._existing(session_id) or self.claim(session_id)
+        hit = vm is not None
+        if vm is None:
+            if not self.manager.has_image():
+                progress("pulling")
+                self.manager.pull_image()
+            progress("starting")
+            vm = self.manager.start(session_id)
+
+        pipe = get_redis().pipeline()
+        pipe.hincrby(self.stats_key, "hits" if hit else "misses", 1)
+        pipe.lpush(self.latency_key, round((time.perf_counter() - t0) * 1000, 1))
+        pipe.ltrim(self.latency_key, 0, 999)
+        pipe.execute()
+        self._wake.set()  # top the pool back up
+        return vm
+
+    def claim(self, session_id: str) -> VmInfo | None:
+        r = get_redis()
+        while True:
+            res = r.eval(_CLAIM_SCRIPT, 2, self.idle_key, self.info_key)
+            if not res:
+                return None
+            cid = res[0]
+            try:
+                if len(res) < 2:
+                    raise RuntimeError("missing connection info")
+                c = self.manager.client.containers.get(cid)
+                if c.status != "running":
+                    raise RuntimeError(f"status {c.status}")
+                c.rename(session_container_name(session_id))
+            except Exception as e:
+                if _name_conflict(e):
+                    # the session's name is taken, not this container's fault
+                    self._put_back(cid, res[1])
+                    raise
+                print(f"vm_pool: discarding {cid[:12]}: {e}")
+                self._remove_container(cid)
+                continue
+            return VmInfo(**json.loads(res[1]))
+
+    def refill(self) -> int:
+        """Start containers until the pool reaches its target size."""
+        lock = acquire_lock(self.lock_key, ttl_seconds=120)
+        if not lock:
+            return 0  # another process is refilling
+        r = get_redis()
+        started = 0
+        try:
+            while not self._stop.is_set():
+                if r.scard(self.idle_key) >= self.target_size:
+                    break
+                self._warm_one()
+                started += 1
+                renew_session_lock(lock, 120)
+        finally:
+            release_session_lock(lock)
+        return started
+
+    def check(self) -> None:
+        """Drop idle containers that died, and any beyond `max_size`."""
+        lock = acquire_lock(self.lock_key, ttl_seconds=120)
+        if not lock:
+            return
+        r = get_redis()
+        try:
+            idle = sorted(r.smembers(self.idle_key))
+            for cid in idle[self.max_size :]:
+                self._discard(cid, "over max size")
+            for cid in idle[: self.max_size]:
+                try:
+                    status = self.manager.client.containers.get(cid).status
+                except Exception as e:
+                    status = f"error: {e}"
+                if status != "running":
+                    self._discard(cid, status)
+        finally:
+            release_session_lock(lock)
+
+    def stats(self) -> dict[str, Any]:
+        pipe = get_redis().pipeline()
+        pipe.scard(self.idle_key)
+        pipe.hgetall(self.stats_key)
+        pipe.lrange(self.latency_key, 0, -1)
+        idle, counters, samples = pipe.execute()
+        lat = sorted(float(x) for x in samples)
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        total = hits + misses
+
+        def pct(p: float) -> float | None:
+            return lat[int(len(lat) * p)] if lat else None
+
+        return {
+            "target": self.target_size,
+            "max": self.max_size,
+            "idle": idle,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else None,
+            "create_ms_p50": pct(0.5),
+            "create_ms_p99": pct(0.99),
+            "warmed": int(counters.get("warmed", 0)),
+            "discarded": int(counters.get("discarded", 0)),
+        }
+
+    def _existing(self, session_id: str) -> VmInfo | None:
+        """
+        The session's container from an earlier run of its provision job
+        (the worker died before committing it): reused if running, else
+        removed so its name can be taken again.
+        """
+        try:
+            c = self.manager.client.containers.get(session_container_name(session_id))
+        except NotFound:
+            return None
+        if c.status == "running":
+            return self.manager.vm_info(c)
+        print(f"vm_pool: removing stale {c.name}: status {c.status}")
+        self.manager.stop(c.id)
+        return None
+
+    def _put_back(self, cid: str, info: str) -> None:
+        pipe = get_redis().pipeline()
+        pipe.hset(self.info_key, cid, info)
+        pipe.sadd(self.idle_key, cid)
+        pipe.execute()
+
+    def _warm_one(self) -> None:
+        name = f"{POOL_NAME_PREFIX}{uuid.uuid4().hex[:12]}"
+        container = self.manager.run_container(name=name, labels={"pool": "warm"})
+        vm = self.manager.vm_info(container)
+        pipe = get_redis().pipeline()
+        pipe.hset(self.info_key, container.id, json.dumps(asdict(vm)))
+        pipe.sadd(self.idle_key, container.id)
+        pipe.hincrby(self.stats_key, "warmed", 1)
+        pipe.execute()
+
+    def _discard(self, cid: str, reason: str) -> None:
+        r = get_redis()
+        if not r.srem(self.idle_key, cid):
+            return  # claimed in the meantime
+        r.hdel(self.info_key, cid)
+        print(f"vm_pool: discarding {cid[:12]}: {reason}")
+        self._remove_container(cid)
+
+    def _remove_container(self, cid: str) -> None:
+        get_redis().hincrby(self.stats_key, "discarded", 1)
+        try:
+            self.manager.stop(cid)
+        except Exception:
+            pass
+
+    def _run(self) -> None:
+        last_check = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - last_check >= self.healthcheck_seconds:
+                    self.check()
+                    last_check = time.monotonic()
+                self.refill()
+            except Exception as e:
+                print(f"vm_pool: refill failed: {e}")
+            self._wake.wait(self.refill_seconds)
+            self._wake.clear()
+
+
+def _name_conflict(e: Exception) -> bool:
+    return isinstance(e, APIError) and (e.status_code == 409 or "Conflict" in str(e))
+
+
+vm_pool = WarmPool(
+    manager=DockerSessionManager(),
+    target_size=settings.VM_POOL_TARGET_SIZE,
+    max_size=settings.VM_POOL_MAX_SIZE,
+    refill_seconds=settings.VM_POOL_REFILL_SECONDS,
+    healthcheck_seconds=settings.VM_POOL_HEALTHCHECK_SECONDS,
+)
@@ -1,38 +1,55 @@
+import asyncio
+import multiprocessing as mp
+import signal
 import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 from sqlalchemy.orm import Session as OrmSession
 
 from app.agent_engine.mock_agent import run_mock_turn
 from app.core.config import settings
 from app.core.db import SessionLocal
-from app.core.events import publish_event
-from app.core.locks import acquire_session_lock, release_session_lock
-from app.core.queue import dequeue_blocking
+from app.core.event_partitions import event_partitions
+from app.core.events import event_sink, publish_event
+from app.core.locks import (
+    acquire_session_lock,
+    keep_session_lock,
+    release_session_lock,
+)
+from app.core.scheduler import (
+    claim_session,
+    complete_job,
+    drop_job,
+    release_session,
+    start_job,
+    touch_claim,
+    yield_session,
+)
+from app.core.session_cache import session_cache
 from app.models.message import Message as MessageModel
 from app.models.session import Session as SessionModel
+from app.session_runner.lifecycle import lifecycle, touch_activity
+from app.session_runner.pool import vm_pool
+from vendor.computer_use_demo import clients as api_clients
 
 
 def _handle_job(job: dict):
     session_id = job["session_id"]
     message_id = job["message_id"]
 
-    lock = acquire_session_lock(session_id, ttl_seconds=180)
-    if not lock:
-        time.sleep(1)
-        from app.core.queue import enqueue
-
-        enqueue(job)
-        return
-
     db: OrmSession = SessionLocal()
     try:
         s = db.get(SessionModel, session_id)
         if not s or s.status in ("stopped", "failed"):
             return
+        if s.status == "paused":
+            lifecycle.resume(s)
 
         # mark running (DB first)
         s.status = "running"
         db.commit()
+        session_cache.put(s)
 
         # emit status immediately, once
         publish_event(
@@ -49,20 +66,21 @@ def _handle_job(job: dict):
             event_type="log",
             payload={"msg": "Starting agent turn"},
         )
-        time.sleep(0.3)
-        publish_event(
-            db=db, session_id=s.id, event_type="token", payload={"delta": "Thinking..."}
-        )
-
         if settings.AGENT_MODE == "mock":
+            time.sleep(0.3)
+            publish_event(
+                db=db,
+                session_id=s.id,
+                event_type="token",
+                payload={"delta": "Thinking..."},
+            )
             # mock agent should write assistant messages itself
             run_mock_turn(db=db, session_id=s.id, user_text=user_text)
         else:
-            import os
-
-            from app.agent_engine import run_computer_use_turn
+            # real tokens are streamed by the adapter, no placeholder
+            from app.agent_engine import VmInfo, run_computer_use_turn
 
-            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            api_key = settings.ANTHROPIC_API_KEY
             if not api_key:
                 raise RuntimeError("ANTHROPIC_API_KEY missing")
 
@@ -70,12 +88,12 @@ def _handle_job(job: dict):
                 db=db,
                 session_id=s.id,
                 user_text=user_text,
-                vm=run_computer_use_turn.VmInfo(
+                vm=VmInfo(
                     vnc_host=s.vnc_host,
                     vnc_port=s.vnc_port,
                     novnc_url=s.novnc_url or "",
                 ),
-                model=os.environ.get("ANTHROPIC_MODEL", "claude-3-5-sonnet-latest"),
+                model=settings.ANTHROPIC_MODEL,
                 anthropic_api_key=api_key,
             )
 
@@ -89,6 +107,7 @@ def _handle_job(job: dict):
         # back to idle
         s.status = "idle"
         db.commit()
+        session_cache.put(s)
         publish_event(
             db=db, session_id=s.id, event_type="status", payload={"status": "idle"}
         )
@@ -100,6 +119,7 @@ def _handle_job(job: dict):
                 s.status = "failed"
                 s.last_error = str(e)
                 db.commit()
+                session_cache.put(s)
                 publish_event(
                     db=db,
                     session_id=s.id,
@@ -110,21 +130,224 @@ def _handle_job(job: dict):
             pass
         raise
     finally:
+        touch_activity(session_id)
+        # turn end: make this turn's events durable before the next one starts
+        event_sink.flush()
+        db.close()
+
+
+def _handle_provision(job: dict):
+    """
+    Start (or claim from the warm pool) the session's VM, streaming progress
+    as status events: pulling / starting (cold start only), then ready.
+    """
+    session_id = job["session_id"]
+
+    db: OrmSession = SessionLocal()
+    try:
+        s = db.get(SessionModel, session_id)
+        if not s or s.status != "creating":
+            return
+
+        def progress(stage: str):
+            publish_event(
+                db=db, session_id=s.id, event_type="status", payload={"status": stage}
+            )
+
+        vm = vm_pool.acquire(str(s.id), on_progress=progress)
+
+        db.refresh(s)
+        if s.status != "creating":
+            # stopped while we were starting it
+            vm_pool.manager.stop(vm.container_id)
+            return
+
+        s.vm_container_id = vm.container_id
+        s.novnc_url = vm.novnc_url
+        s.vnc_host = vm.vnc_host
+        s.vnc_port = vm.vnc_port
+        s.status = "idle"
+        db.commit()
+        session_cache.put(s)
+        touch_activity(s.id)
+        publish_event(
+            db=db,
+            session_id=s.id,
+            event_type="status",
+            payload={"status": "ready", "novnc_url": vm.novnc_url},
+        )
+
+    except Exception as e:
+        try:
+            s = db.get(SessionModel, session_id)
+            if s:
+                s.status = "failed"
+                s.last_error = f"Failed to start session VM: {e}"
+                db.commit()
+                session_cache.put(s)
+                publish_event(
+                    db=db,
+                    session_id=s.id,
+                    event_type="status",
+                    payload={"status": "failed", "error": s.last_error},
+                )
+        except Exception:
+            pass
+        raise
+    finally:
+        event_sink.flush()
         db.close()
+
+
+_HANDLERS = {"provision": _handle_provision, "message": _handle_job}
+
+
+def _run_session(claim: dict, stopping: Callable[[], bool] = lambda: False) -> None:
+    """
+    Drain one claimed session's FIFO in order, up to
+    SESSION_MAX_JOBS_PER_CLAIM jobs (or until the worker is draining), then
+    hand the session back.
+    """
+    session_id = claim["session_id"]
+
+    # The claim already makes us the session's only consumer; the lock guards
+    # against a reclaimed claim whose original worker is still alive. On a
+    # miss the session goes to the back of the line, to be retried shortly.
+    lock = acquire_session_lock(session_id, ttl_seconds=settings.LOCK_TTL_SECONDS)
+    for _ in range(5):
+        if lock:
+            break
+        time.sleep(1)  # the idle reaper holds it briefly while pausing
+        lock = acquire_session_lock(session_id, ttl_seconds=settings.LOCK_TTL_SECONDS)
+    if not lock:
+        print(f"worker: session {session_id} still locked, yielding it")
+        yield_session(claim)
+        return
+
+    try:
+        with keep_session_lock(
+            lock,
+            ttl_seconds=settings.LOCK_TTL_SECONDS,
+            interval_seconds=settings.LOCK_RENEW_SECONDS,
+            on_renew=lambda: touch_claim(claim),
+        ):
+            _drain_session(claim, stopping)
+    finally:
         release_session_lock(lock)
 
 
-def run_forever():
-    print("worker: starting job loop")
-    while True:
-        job = dequeue_blocking(timeout_seconds=5)
-        if not job:
+def _drain_session(claim: dict, stopping: Callable[[], bool]) -> None:
+    session_id = claim["session_id"]
+    handled = 0
+    while handled < settings.SESSION_MAX_JOBS_PER_CLAIM and not stopping():
+        head = start_job(session_id)
+        if head is None:
+            if release_session(claim):
+                return
+            continue
+
+        job, attempts = head
+        if attempts > settings.QUEUE_MAX_DELIVERIES:
+            # the job keeps killing workers; drop it instead of wedging the
+            # whole session behind it
+            print(f"worker: dropping poison job {job} after {attempts - 1} tries")
+            drop_job(session_id)
             continue
+
         try:
-            _handle_job(job)
+            _HANDLERS[job.get("kind", "message")](job)
         except Exception as e:
             # avoid crashing the worker
             print("worker: job failed:", e)
+        # failures are recorded on the session; only a crash leaves the
+        # job at the head of the FIFO, to be retried with the claim
+        complete_job(session_id)
+        handled += 1
+
+    # busy session (or we are shutting down): let another worker continue
+    yield_session(claim)
+
+
+async def _slot(n: int, stop: asyncio.Event) -> None:
+    """One concurrency slot: claim a session, run it, repeat until draining."""
+    while not stop.is_set():
+        claim = await asyncio.to_thread(claim_session, timeout_seconds=2)
+        if not claim:
+            continue
+        try:
+            await asyncio.to_thread(_run_session, claim, stop.is_set)
+        except Exception as e:
+            print(f"worker: slot {n} failed on session {claim['session_id']}:", e)
+
+
+async def serve(concurrency: int) -> None:
+    """
+    Run `concurrency` turns at once in this process. Turns are I/O bound
+    (model API, screenshot settle delays, subprocesses), so they run on
+    threads coordinated by one event loop. SIGTERM/SIGINT stop claiming new
+    sessions and wait for in-flight turns to finish.
+    """
+    loop = asyncio.get_running_loop()
+    # each slot blocks one thread on claim/turn, plus its lock renewer
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2 + 2))
+
+    stop = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    # VM provisioning happens here, so the warm pool is kept here too (one
+    # refiller across processes)
+    vm_pool.start()
+    lifecycle.start()
+    event_partitions.start()
+    api_clients.configure(
+        api_clients.HttpPoolConfig(
+            max_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.ANTHROPIC_MAX_KEEPALIVE,
+            keepalive_expiry=settings.ANTHROPIC_KEEPALIVE_SECONDS,
+            http2=settings.ANTHROPIC_HTTP2,
+        )
+    )
+    print(f"worker: starting {concurrency} slots")
+    try:
+        await asyncio.gather(*(_slot(n, stop) for n in range(concurrency)))
+    finally:
+        await asyncio.to_thread(lifecycle.stop)
+        await asyncio.to_thread(event_partitions.stop)
+        await asyncio.to_thread(vm_pool.stop)
+        api_clients.close()
+    print("worker: drained, exiting")
+
+
+def _serve_process(concurrency: int) -> None:
+    asyncio.run(serve(concurrency))
+
+
+def run_forever():
+    concurrency = max(1, settings.WORKER_CONCURRENCY)
+    processes = max(1, settings.WORKER_PROCESSES)
+    if processes == 1:
+        _serve_process(concurrency)
+        return
+
+    # one process per core, each with its own event loop and slots
+    ctx = mp.get_context("spawn")
+    procs = [
+        ctx.Process(target=_serve_process, args=(concurrency,), name=f"worker-{i}")
+        for i in range(processes)
+    ]
+    for p in procs:
+        p.start()
+
+    def forward(signum, _frame):
+        for p in procs:
+            if p.is_alive():
+                p.terminate()  # SIGTERM => child drains
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for p in procs:
+        p.join()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""
+Model API calls: a new client (and connection pool) per loop iteration, as
+upstream's `sampling_loop` did, vs the cached per-worker client.
+
+Runs --turns turns of --steps model calls each against the local stub server
+(benchmarks/stub_anthropic.py) and reports connect / time to first byte /
+total per call, from the same httpx trace hooks the worker uses.
+
+    python -m benchmarks.anthropic_client --turns 20 --steps 8 --latency-ms 20
+"""
+
+import argparse
+import time
+
+from anthropic import Anthropic, DefaultHttpxClient
+
+from benchmarks.stub_anthropic import StubServer
+from vendor.computer_use_demo import clients
+
+MESSAGES = [{"role": "user", "content": "open firefox"}]
+
+
+def _call(client: Anthropic) -> None:
+    client.beta.messages.with_raw_response.create(
+        max_tokens=1024, messages=MESSAGES, model="stub", betas=[]
+    ).parse()
+
+
+def _fresh_client(base_url: str) -> Anthropic:
+    # upstream: Anthropic(...) per iteration, each with its own pool
+    return Anthropic(
+        api_key="stub",
+        base_url=base_url,
+        max_retries=4,
+        http_client=DefaultHttpxClient(event_hooks={"request": [clients._add_trace]}),
+    )
+
+
+def _report(name: str, server: StubServer, wall: float, calls: int) -> None:
+    st = clients.timings.stats()
+    print(
+        f"{name:<8} {calls / wall:>7.1f} calls/s  conns={server.connections:<5} "
+        f"connect p50={st['connect_ms_p50'] or 0:>5.2f}ms  "
+        f"ttfb p50={st['ttfb_ms_p50']:>6.2f}ms  "
+        f"total p50={st['total_ms_p50']:>6.2f}ms p99={st['total_ms_p99']:>6.2f}ms"
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    calls = args.turns * args.steps
+    for name in ("upstream", "cached"):
+        clients.timings.reset()
+        with StubServer(latency_s=args.latency_ms / 1000) as server:
+            t = time.perf_counter()
+            for _ in range(args.turns):
+                for _ in range(args.steps):
+                    if name == "upstream":
+                        client = _fresh_client(server.url)
+                    else:
+                        client = clients.get_client("anthropic", "stub", server.url)
+                    _call(client)
+            _report(name, server, time.perf_counter() - t, calls)
+        clients.close()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--turns", type=int, default=20)
+    p.add_argument("--steps", type=int, default=8, help="model calls per turn")
+    p.add_argument("--latency-ms", type=float, default=20.0, help="stub think time")
+    main(p.parse_args())
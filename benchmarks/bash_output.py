@@ -0,0 +1,94 @@
+"""
+Bash tool output reading: upstream 200 ms polling of the StreamReader buffer
+vs the event-driven reader.
+
+Runs many tiny commands (per-command latency) and one command printing
+--mb megabytes (throughput; upstream stalls once the pipe buffer is full, so
+that case is bounded by --timeout). No services or X needed.
+
+    python -m benchmarks.bash_output -n 100 --mb 50
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import statistics
+import time
+
+from vendor.computer_use_demo.tools.base import CLIResult, ToolError
+from vendor.computer_use_demo.tools.bash import _BashSession
+
+
+class _PollingSession(_BashSession):
+    """The upstream `run`: sleep 0.2 s, re-decode the whole buffer, repeat."""
+
+    _output_delay = 0.2
+
+    async def run(self, command: str):
+        proc = self._process
+        assert proc.stdin and proc.stdout and proc.stderr
+        proc.stdin.write(command.encode() + f"; echo '{self._sentinel}'\n".encode())
+        await proc.stdin.drain()
+        try:
+            async with asyncio.timeout(self._timeout):
+                while True:
+                    await asyncio.sleep(self._output_delay)
+                    output = proc.stdout._buffer.decode()  # type: ignore[attr-defined]
+                    if self._sentinel in output:
+                        output = output[: output.index(self._sentinel)]
+                        break
+        except asyncio.TimeoutError:
+            self._timed_out = True
+            raise ToolError("timed out") from None
+        error = proc.stderr._buffer.decode()  # type: ignore[attr-defined]
+        proc.stdout._buffer.clear()  # type: ignore[attr-defined]
+        proc.stderr._buffer.clear()  # type: ignore[attr-defined]
+        return CLIResult(output=output, error=error)
+
+
+async def _tiny(session: _BashSession, n: int) -> list[float]:
+    samples = []
+    for i in range(n):
+        t = time.perf_counter()
+        await session.run(f"echo {i}")
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+async def _case(cls: type[_BashSession], args: argparse.Namespace) -> str:
+    session = cls()
+    session._timeout = args.timeout
+    await session.start()
+    try:
+        samples = await _tiny(session, args.n)
+        p50 = statistics.median(samples) * 1000
+        t = time.perf_counter()
+        try:
+            result = await session.run(
+                f"head -c {args.mb * 1024 * 1024} /dev/zero | tr '\\0' 'a'"
+            )
+            big = f"{time.perf_counter() - t:>7.2f}s  kept {len(result.output or '')} B"
+        except ToolError:
+            big = f"timed out after {args.timeout:.0f}s"
+    finally:
+        # the session group, including a pipeline stalled on a full pipe; a
+        # paused pipe never reads EOF, so close the transport directly
+        os.killpg(session._process.pid, signal.SIGKILL)
+        session._process._transport.close()  # type: ignore[attr-defined]
+    total = sum(samples)
+    return f"{p50:>8.1f}ms {total:>7.2f}s   {big}"
+
+
+async def _main(args: argparse.Namespace) -> None:
+    print(f"{'':<10} {'tiny p50':>10} {f'x{args.n}':>8}   {args.mb} MB output")
+    print(f"{'polling':<10} {await _case(_PollingSession, args)}")
+    print(f"{'streaming':<10} {await _case(_BashSession, args)}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=100, help="tiny commands")
+    p.add_argument("--mb", type=int, default=50, help="size of the large output")
+    p.add_argument("--timeout", type=float, default=20.0, help="per command")
+    asyncio.run(_main(p.parse_args()))
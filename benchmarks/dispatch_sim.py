@@ -0,0 +1,179 @@
+"""
+Dispatch benchmark: lock-miss sleep-and-requeue vs per-session FIFO dispatch.
+
+Discrete-event simulation of the worker pool (no Redis needed), replaying the
+same arrival trace through both policies:
+
+- requeue: one global FIFO of jobs; a worker that pops a job whose session is
+  busy sleeps 1 s and pushes the job to the back (the old `_handle_job`)
+- fifo: per-session FIFOs plus a queue of runnable sessions; a worker claims
+  a session and drains up to `--batch` jobs in order (app/core/scheduler.py)
+
+A few "hot" sessions receive bursts of messages, which is what produces
+head-of-line blocking under the old policy.
+
+    python -m benchmarks.dispatch_sim --sessions 500 --workers 16 --hot 5
+"""
+
+import argparse
+import heapq
+import random
+from collections import deque
+
+
+def _trace(args: argparse.Namespace) -> list[tuple[float, int]]:
+    rnd = random.Random(args.seed)
+    jobs: list[tuple[float, int]] = []
+    for sid in range(args.sessions):
+        hot = sid < args.hot
+        rate = args.hot_rate if hot else args.rate  # messages/sec
+        t = rnd.expovariate(rate)
+        while t < args.duration:
+            jobs.append((t, sid))
+            t += rnd.expovariate(rate)
+    jobs.sort()
+    return jobs
+
+
+def _service(rnd: random.Random, mean: float) -> float:
+    return rnd.lognormvariate(0, 0.5) * mean / 1.13  # lognormal, mean ~= `mean`
+
+
+def simulate(policy: str, trace, args: argparse.Namespace) -> dict:
+    rnd = random.Random(args.seed + 1)
+    events: list = []
+    seq = 0
+
+    def push(t, kind, data=None):
+        nonlocal seq
+        heapq.heappush(events, (t, seq, kind, data))
+        seq += 1
+
+    for i, (t, sid) in enumerate(trace):
+        push(t, "arrive", (i, sid))
+
+    idle = args.workers
+    busy_sessions: set[int] = set()
+    waits: dict[int, float] = {}
+    started_order: dict[int, int] = {}
+    reorders = 0
+    wasted = 0.0
+
+    # requeue policy state
+    global_q: deque = deque()
+    # fifo policy state
+    session_q: dict[int, deque] = {}
+    ready: deque = deque()
+    scheduled: set[int] = set()
+
+    def start(t, job_id, sid):
+        nonlocal reorders
+        arrived = trace[job_id][0]
+        waits[job_id] = t - arrived
+        if started_order.get(sid, -1) > job_id:
+            reorders += 1
+        started_order[sid] = max(started_order.get(sid, -1), job_id)
+        return t + _service(rnd, args.service)
+
+    def dispatch(t):
+        nonlocal idle, wasted
+        while idle:
+            if policy == "requeue":
+                if not global_q:
+                    return
+                job_id, sid = global_q.popleft()
+                idle -= 1
+                if sid in busy_sessions:
+                    wasted += 1.0
+                    push(t + 1.0, "requeue", (job_id, sid))
+                    continue
+                busy_sessions.add(sid)
+                push(start(t, job_id, sid), "done", (job_id, sid, 0))
+            else:
+                if not ready:
+                    return
+                sid = ready.popleft()
+                idle -= 1
+                job_id = session_q[sid].popleft()
+                push(start(t, job_id, sid), "done", (job_id, sid, 1))
+
+    while events:
+        t, _, kind, data = heapq.heappop(events)
+        if kind == "arrive":
+            job_id, sid = data
+            if policy == "requeue":
+                global_q.append((job_id, sid))
+            else:
+                session_q.setdefault(sid, deque()).append(job_id)
+                if sid not in scheduled:
+                    scheduled.add(sid)
+                    ready.append(sid)
+        elif kind == "requeue":
+            global_q.append(data)
+            idle += 1
+        elif kind == "done":
+            job_id, sid, handled = data
+            if policy == "requeue":
+                busy_sessions.discard(sid)
+                idle += 1
+            elif session_q[sid] and handled < args.batch:
+                nxt = session_q[sid].popleft()
+                push(start(t, nxt, sid), "done", (nxt, sid, handled + 1))
+            else:
+                if session_q[sid]:
+                    ready.append(sid)  # yield: back of the line
+                else:
+                    scheduled.discard(sid)
+                idle += 1
+        dispatch(t)
+
+    cold = sorted(w for j, w in waits.items() if trace[j][1] >= args.hot)
+    hot = sorted(w for j, w in waits.items() if trace[j][1] < args.hot)
+    every = sorted(waits.values())
+
+    def pct(xs, p):
+        return xs[min(len(xs) - 1, int(len(xs) * p))] if xs else 0.0
+
+    return {
+        "jobs": len(waits),
+        "p50": pct(every, 0.5),
+        "p99": pct(every, 0.99),
+        "cold_p99": pct(cold, 0.99),
+        "hot_p99": pct(hot, 0.99),
+        "reorders": reorders,
+        "lock_miss_worker_s": wasted,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    trace = _trace(args)
+    print(
+        f"{len(trace)} jobs, {args.sessions} sessions ({args.hot} hot), "
+        f"{args.workers} workers, mean turn {args.service}s"
+    )
+    header = (
+        f"{'policy':<8} {'p50 wait':>9} {'p99 wait':>9} {'cold p99':>9} "
+        f"{'hot p99':>9} {'reorders':>9} {'HOL worker-s':>13}"
+    )
+    print(header)
+    for policy in ("requeue", "fifo"):
+        r = simulate(policy, trace, args)
+        print(
+            f"{policy:<8} {r['p50']:>8.2f}s {r['p99']:>8.2f}s "
+            f"{r['cold_p99']:>8.2f}s {r['hot_p99']:>8.2f}s "
+            f"{r['reorders']:>9} {r['lock_miss_worker_s']:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--sessions", type=int, default=500)
+    p.add_argument("--hot", type=int, default=5, help="sessions receiving bursts")
+    p.add_argument("--workers", type=int, default=16)
+    p.add_argument("--rate", type=float, default=0.01, help="msgs/sec per session")
+    p.add_argument("--hot-rate", type=float, default=0.5, help="msgs/sec, hot")
+    p.add_argument("--service", type=float, default=2.0, help="mean turn seconds")
+    p.add_argument("--batch", type=int, default=8, help="jobs per session claim")
+    p.add_argument("--duration", type=float, default=600.0)
+    p.add_argument("--seed", type=int, default=7)
+    main(p.parse_args())
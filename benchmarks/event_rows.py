@@ -0,0 +1,91 @@
+"""
+Rows written to the `events` table per turn, before and after storage policies.
+
+Feeds a synthetic streaming turn (token deltas interleaved with tool calls,
+screenshots and logs) through EventSink twice - once with every event durable
+(previous behaviour) and once with the configured EVENT_LIVE_ONLY_TYPES /
+EVENT_COALESCE_TYPES - and counts the rows that would be inserted. No
+database needed.
+
+    python -m benchmarks.event_rows --steps 20 --tokens-per-step 60
+"""
+
+import argparse
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.core.events import EventSink, event_policy
+
+
+class CountingSink(EventSink):
+    def __init__(self, coalesce_window_ms: int):
+        super().__init__(
+            batch_size=10**9,
+            interval_ms=10**9,
+            max_buffer=10**9,
+            coalesce_window_ms=coalesce_window_ms,
+        )
+        self.written = 0
+        self.bytes = 0
+
+    def _write(self, rows):
+        self.written += len(rows)
+        self.bytes += sum(len(str(r["payload"])) for r in rows)
+
+
+def _turn(steps: int, tokens: int, token_ms: float):
+    t = datetime.now(timezone.utc)
+    yield t, "status", {"status": "running"}
+    yield t, "log", {"msg": "Starting agent turn"}
+    for step in range(steps):
+        for i in range(tokens):
+            t += timedelta(milliseconds=token_ms)
+            yield t, "token", {"delta": f"w{i} "}
+        t += timedelta(milliseconds=50)
+        yield t, "tool_call", {"tool": "computer", "action": "left_click"}
+        t += timedelta(seconds=2)
+        yield t, "screenshot", {"hash": f"{step:064x}"}
+        yield t, "log", {"msg": f"step {step} done"}
+    yield t, "message", {"role": "assistant", "content": "done"}
+    yield t, "status", {"status": "idle"}
+
+
+def _run(args, policies: bool) -> CountingSink:
+    sink = CountingSink(settings.EVENT_COALESCE_WINDOW_MS if policies else 0)
+    sid = uuid.uuid4()
+    for seq, (ts, etype, payload) in enumerate(
+        _turn(args.steps, args.tokens_per_step, args.token_ms), start=1
+    ):
+        row = {
+            "session_id": sid,
+            "seq": seq,
+            "type": etype,
+            "payload": payload,
+            "created_at": ts,
+        }
+        sink.add(row, policy=event_policy(etype) if policies else "durable")
+    sink.flush()
+    return sink
+
+
+def main(args: argparse.Namespace) -> None:
+    before = _run(args, policies=False)
+    after = _run(args, policies=True)
+    events = before.stats()["events"]
+    print(f"events per turn: {events}")
+    print(f"rows per turn before: {before.written} ({before.bytes} payload bytes)")
+    print(f"rows per turn after:  {after.written} ({after.bytes} payload bytes)")
+    print(
+        f"policies: live_only={settings.EVENT_LIVE_ONLY_TYPES} "
+        f"coalesce={settings.EVENT_COALESCE_TYPES} "
+        f"window={settings.EVENT_COALESCE_WINDOW_MS}ms"
+    )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--steps", type=int, default=20, help="tool steps per turn")
+    p.add_argument("--tokens-per-step", type=int, default=60)
+    p.add_argument("--token-ms", type=float, default=15.0, help="delta spacing")
+    main(p.parse_args())
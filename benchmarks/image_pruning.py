@@ -0,0 +1,126 @@
+"""
+Screenshot pruning over a long synthetic agent turn.
+
+Builds a conversation step by step (assistant tool_use, then a tool_result
+with one screenshot) and, before every simulated request, applies:
+
+  all          no pruning (upstream behaviour with prompt caching on)
+  rescan       upstream `_maybe_filter_to_n_most_recent_images`
+  index        `ImageIndex`, same result, O(new blocks) per step
+  index-cache  `ImageIndex` cutting at message boundaries (prompt caching)
+
+and reports the pruning CPU time, the request payload size and how often
+the request prefix changed (each change rewrites the prompt cache).
+
+    python -m benchmarks.image_pruning --steps 200 --keep 10 --image-kb 100
+"""
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import time
+
+from vendor.computer_use_demo.image_index import ImageIndex
+from vendor.computer_use_demo.loop import _maybe_filter_to_n_most_recent_images
+
+
+def _step(i: int, image: str) -> list[dict]:
+    tool_id = f"toolu_{i:04d}"
+    return [
+        {
+            "role": "assistant",
+            "content": [
+                {"type": "text", "text": f"Step {i}: clicking the next link."},
+                {
+                    "type": "tool_use",
+                    "id": tool_id,
+                    "name": "computer",
+                    "input": {"action": "left_click", "coordinate": [512, 384]},
+                },
+            ],
+        },
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": tool_id,
+                    "content": [
+                        {"type": "text", "text": "clicked"},
+                        {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": "image/png",
+                                "data": image,
+                            },
+                        },
+                    ],
+                },
+            ],
+        },
+    ]
+
+
+def _images(messages: list[dict]) -> int:
+    return sum(
+        1
+        for m in messages[1:]
+        for block in m["content"]
+        if block["type"] == "tool_result"
+        for item in block["content"]
+        if item["type"] == "image"
+    )
+
+
+def _run(policy: str, args: argparse.Namespace, image: str) -> dict:
+    messages: list[dict] = [{"role": "user", "content": "fill in the form"}]
+    index = ImageIndex()
+    prune_s: list[float] = []
+    sizes: list[int] = []
+    rewrites = 0
+    for i in range(args.steps):
+        messages.extend(_step(i, image))
+        before = _images(messages)
+        t = time.perf_counter()
+        if policy == "rescan":
+            _maybe_filter_to_n_most_recent_images(messages, args.keep, args.keep)
+        elif policy != "all":
+            index.update(messages)
+            index.prune(args.keep, args.keep, whole_messages=policy == "index-cache")
+        prune_s.append(time.perf_counter() - t)
+        rewrites += _images(messages) != before
+        sizes.append(len(json.dumps(messages)))
+    return {
+        "prune_us": statistics.median(prune_s) * 1e6,
+        "prune_ms_total": sum(prune_s) * 1000,
+        "last_kb": sizes[-1] / 1024,
+        "mean_kb": statistics.mean(sizes) / 1024,
+        "sent_mb": sum(sizes) / 1024 / 1024,
+        "rewrites": rewrites,
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    image = base64.b64encode(os.urandom(args.image_kb * 768)).decode()
+    print(
+        f"{'policy':<12} {'prune p50':>10} {'prune sum':>10} {'last req':>10} "
+        f"{'mean req':>10} {'total sent':>11} {'prefix changes':>15}"
+    )
+    for policy in ("all", "rescan", "index", "index-cache"):
+        r = _run(policy, args, image)
+        print(
+            f"{policy:<12} {r['prune_us']:>8.1f}us {r['prune_ms_total']:>8.2f}ms "
+            f"{r['last_kb']:>8.0f}KB {r['mean_kb']:>8.0f}KB "
+            f"{r['sent_mb']:>9.1f}MB {r['rewrites']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--steps", type=int, default=200, help="tool calls in the turn")
+    p.add_argument("--keep", type=int, default=10, help="only_n_most_recent_images")
+    p.add_argument("--image-kb", type=int, default=100, help="base64 screenshot size")
+    main(p.parse_args())
@@ -0,0 +1,99 @@
+"""
+Input injection: per-action `run()` (new /bin/sh + xdotool each time) vs the
+persistent per-display channel.
+
+Times a stream of cheap actions (actions/sec, one round trip each and batched
+N per round trip) and typing a 2 KB string: upstream splits it into 50-char
+chunks, one process each; the channel sends it as one xdotool call.
+
+    python -m benchmarks.input_channel -n 500
+
+Needs xdotool and an X display (DISPLAY_NUM or DISPLAY). Without them,
+--dry-run swaps xdotool for /bin/true, measuring dispatch overhead only.
+"""
+
+import argparse
+import asyncio
+import os
+import shlex
+import shutil
+import time
+
+TEXT_2KB = ("The quick brown fox jumps over the lazy dog. " * 50)[:2048]
+
+
+async def _actions(run_one, n: int) -> float:
+    t = time.perf_counter()
+    for _ in range(n):
+        await run_one()
+    return n / (time.perf_counter() - t)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from vendor.computer_use_demo.tools.computer import (
+        TYPING_DELAY_MS,
+        TYPING_GROUP_SIZE,
+        chunks,
+    )
+    from vendor.computer_use_demo.tools.run import run
+    from vendor.computer_use_demo.tools.xdo import XdotoolChannel
+
+    display = os.getenv("DISPLAY_NUM")
+    prefix = f"DISPLAY=:{display} " if display else ""
+    xdotool = "/bin/true" if args.dry_run else f"{prefix}xdotool"
+    action = f"{xdotool} mousemove_relative 0 0"
+    delay = args.typing_delay_ms
+
+    def type_cmd(chunk: str) -> str:
+        return f"{xdotool} type --delay {delay} -- {shlex.quote(chunk)}"
+
+    channel = XdotoolChannel()
+    await channel.start()
+
+    async def old_action():
+        await run(action)
+
+    async def new_action():
+        await channel.run(action)
+
+    async def new_batch():
+        await channel.run(*[action] * args.batch)
+
+    old = await _actions(old_action, args.n)
+    new = await _actions(new_action, args.n)
+    batched = await _actions(new_batch, args.n // args.batch) * args.batch
+    print(f"{'actions/sec':<28} {'run()':>10} {'channel':>10}")
+    print(f"{'  one per round trip':<28} {old:>10.0f} {new:>10.0f}")
+    print(f"{f'  {args.batch} per round trip':<28} {'':>10} {batched:>10.0f}")
+
+    t = time.perf_counter()
+    for chunk in chunks(TEXT_2KB, TYPING_GROUP_SIZE):
+        await run(type_cmd(chunk))
+    old_type = time.perf_counter() - t
+    t = time.perf_counter()
+    await channel.run(type_cmd(TEXT_2KB))
+    new_type = time.perf_counter() - t
+    n_chunks = len(chunks(TEXT_2KB, TYPING_GROUP_SIZE))
+    print(f"\ntype 2 KB (--delay {delay}ms, upstream {TYPING_DELAY_MS}ms)")
+    print(f"  run() x{n_chunks:<4} {old_type:>8.3f}s  {2048 / old_type:>9.0f} chars/s")
+    print(f"  channel x1  {new_type:>8.3f}s  {2048 / new_type:>9.0f} chars/s")
+    channel.stop()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=500, help="actions per case")
+    p.add_argument("--batch", type=int, default=10, help="actions per round trip")
+    p.add_argument(
+        "--typing-delay-ms",
+        type=int,
+        default=0,
+        help="xdotool --delay; 0 isolates the per-process cost",
+    )
+    p.add_argument("--dry-run", action="store_true", help="no X server needed")
+    args = p.parse_args()
+    has_display = os.getenv("DISPLAY_NUM") or os.getenv("DISPLAY")
+    if not args.dry_run and not (shutil.which("xdotool") and has_display):
+        print("xdotool or display not found, running --dry-run")
+        args.dry_run = True
+    asyncio.run(_main(args))
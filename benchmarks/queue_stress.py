@@ -0,0 +1,109 @@
+"""
+Stress test for the Redis Streams job queue against a local Redis.
+
+Enqueues N jobs, runs W worker processes that dequeue/ack them, SIGKILLs a
+random worker every `--kill-every` seconds (and starts a replacement), then
+checks that every job was processed at least once. Reports jobs/sec,
+duplicate deliveries (expected after kills) and dead letters.
+
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.queue_stress \
+        --jobs 20000 --workers 8 --kill-every 1.0
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import signal
+import time
+import uuid
+
+from app.core.queue import StreamQueue
+from app.core.redis import get_redis
+
+
+def _worker(prefix: str, claim_idle: int, work_ms: float) -> None:
+    q = StreamQueue(
+        key=f"{prefix}:stream",
+        dead_letter_key=f"{prefix}:dead",
+        claim_idle_seconds=claim_idle,
+    )
+    r = get_redis()
+    consumer = f"bench-{os.getpid()}"
+    while True:
+        job = q.dequeue_blocking(timeout_seconds=1, consumer=consumer)
+        if job is None:
+            continue
+        if work_ms:
+            time.sleep(work_ms / 1000)
+        pipe = r.pipeline()
+        pipe.sadd(f"{prefix}:done", job["n"])
+        pipe.incr(f"{prefix}:processed")
+        pipe.execute()
+        q.ack(job)
+
+
+def main(args: argparse.Namespace) -> None:
+    prefix = f"bench:queue:{uuid.uuid4().hex[:8]}"
+    r = get_redis()
+    q = StreamQueue(key=f"{prefix}:stream", dead_letter_key=f"{prefix}:dead")
+
+    pipe = r.pipeline(transaction=False)
+    for n in range(args.jobs):
+        pipe.xadd(q.key, {"job": f'{{"n": {n}}}'})
+    pipe.execute()
+    print(f"enqueued {args.jobs} jobs into {q.key}")
+
+    ctx = mp.get_context("spawn")
+
+    def spawn():
+        p = ctx.Process(
+            target=_worker, args=(prefix, args.claim_idle, args.work_ms), daemon=True
+        )
+        p.start()
+        return p
+
+    procs = [spawn() for _ in range(args.workers)]
+    kills = 0
+    t0 = time.perf_counter()
+    last_kill = t0
+    try:
+        while r.scard(f"{prefix}:done") < args.jobs:
+            time.sleep(0.1)
+            if time.perf_counter() - t0 > args.deadline:
+                break
+            if args.kill_every and time.perf_counter() - last_kill > args.kill_every:
+                victim = random.randrange(len(procs))
+                os.kill(procs[victim].pid, signal.SIGKILL)
+                procs[victim].join()
+                procs[victim] = spawn()
+                kills += 1
+                last_kill = time.perf_counter()
+    finally:
+        elapsed = time.perf_counter() - t0
+        for p in procs:
+            p.kill()
+
+    done = r.scard(f"{prefix}:done")
+    processed = int(r.get(f"{prefix}:processed") or 0)
+    print(f"workers killed: {kills}")
+    verdict = "OK" if done == args.jobs else "LOST"
+    print(f"unique jobs done: {done}/{args.jobs} ({verdict})")
+    print(f"deliveries: {processed} (duplicates: {processed - done})")
+    print(f"dead letters: {r.xlen(q.dead_letter_key)}")
+    print(f"throughput: {done / elapsed:.0f} jobs/sec over {elapsed:.1f}s")
+
+    r.delete(q.key, q.dead_letter_key, f"{prefix}:done", f"{prefix}:processed")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--jobs", type=int, default=10000)
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--work-ms", type=float, default=0.0)
+    p.add_argument("--kill-every", type=float, default=1.0, help="seconds; 0=never")
+    p.add_argument(
+        "--claim-idle", type=int, default=2, help="XAUTOCLAIM idle threshold (s)"
+    )
+    p.add_argument("--deadline", type=float, default=300.0)
+    main(p.parse_args())
@@ -0,0 +1,69 @@
+"""
+Micro-benchmark: per-publish latency with a fresh client vs the shared pool.
+
+"fresh" reproduces the old `get_redis()` (a new `Redis.from_url` client, and
+therefore a new TCP connection, per call); "pooled" uses the process-wide
+client from app/core/redis.py. Also runs the pooled path from several threads
+to show pool waits.
+
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.redis_publish -n 5000
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import get_redis, pool_stats
+
+
+def _fresh_publish(channel: str, msg: str) -> None:
+    r = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    r.publish(channel, msg)
+    r.close()
+
+
+def _pooled_publish(channel: str, msg: str) -> None:
+    get_redis().publish(channel, msg)
+
+
+def _measure(fn, n: int) -> list[float]:
+    samples = []
+    for i in range(n):
+        t = time.perf_counter()
+        fn("bench:publish", f'{{"i": {i}}}')
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def _report(name: str, samples: list[float]) -> None:
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99)]
+    print(
+        f"{name:<18} p50={statistics.median(samples) * 1e6:>7.0f}us "
+        f"p99={p99 * 1e6:>7.0f}us  {len(samples) / sum(samples):>8.0f} ops/s"
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    _report("fresh client", _measure(_fresh_publish, args.n))
+    _report("pooled client", _measure(_pooled_publish, args.n))
+
+    with ThreadPoolExecutor(args.threads) as ex:
+        per_thread = args.n // args.threads
+        results = ex.map(
+            lambda _: _measure(_pooled_publish, per_thread), range(args.threads)
+        )
+        samples = [s for chunk in results for s in chunk]
+    _report(f"pooled x{args.threads} thr", samples)
+    print(f"pool: {pool_stats()['sync']}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=5000)
+    p.add_argument("--threads", type=int, default=16)
+    main(p.parse_args())
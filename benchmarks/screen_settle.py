@@ -0,0 +1,84 @@
+"""
+Post-action wait: fixed 2 s delay vs settle detection, on a simulated screen.
+
+Each simulated action reacts after a random delay, animates for a random
+duration (a region changing every frame), then stays put; a caret blinks
+throughout, and --noop of the actions change nothing. Reports how long each
+strategy waited and how often the detector returned before the animation had
+finished (premature). No X server needed.
+
+    python -m benchmarks.screen_settle -n 40 --window 0.4
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+from vendor.computer_use_demo.tools.settle import SettleDetector
+
+SIZE = (1280, 800)
+
+
+class SimulatedScreen:
+    def __init__(self, react_s: float, animate_s: float, noop: bool):
+        self.t0 = time.monotonic()
+        self.react_s = react_s
+        self.done_s = react_s + animate_s
+        self.noop = noop
+
+    def grab(self) -> Image.Image:
+        t = time.monotonic() - self.t0
+        img = Image.new("RGB", SIZE, (240, 240, 240))
+        d = ImageDraw.Draw(img)
+        if int(t / 0.53) % 2:  # caret
+            d.rectangle((400, 300, 401, 316), fill=(0, 0, 0))
+        if not self.noop and t >= self.react_s:
+            # a window sliding in, then resting
+            x = int(min(t, self.done_s) * 900) % 600
+            d.rectangle((x, 100, x + 500, 600), fill=(60, 90, 160))
+        return img
+
+
+async def _run(args: argparse.Namespace) -> None:
+    waited, premature, timeouts = [], 0, 0
+    for _ in range(args.n):
+        noop = random.random() < args.noop
+        screen = SimulatedScreen(
+            react_s=random.uniform(0.0, args.max_react),
+            animate_s=random.uniform(0.0, args.max_animate),
+            noop=noop,
+        )
+        detector = SettleDetector(screen.grab, window=args.window)
+        w, settled = await detector.wait(args.delay)
+        waited.append(w)
+        timeouts += not settled
+        if not noop and w < screen.done_s:
+            premature += 1
+
+    waited.sort()
+    p99 = waited[min(len(waited) - 1, int(len(waited) * 0.99))]
+    print(f"{args.n} actions ({args.noop:.0%} no-op), window {args.window}s")
+    print(f"fixed delay   p50={args.delay:.2f}s p99={args.delay:.2f}s")
+    print(
+        f"settle        p50={statistics.median(waited):.2f}s p99={p99:.2f}s "
+        f"premature={premature} timeouts={timeouts}"
+    )
+    print(f"saved per action (mean): {args.delay - statistics.mean(waited):.2f}s")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=40, help="simulated actions")
+    p.add_argument("--delay", type=float, default=2.0, help="fixed delay / cap")
+    p.add_argument("--window", type=float, default=0.4, help="stable window")
+    p.add_argument("--max-react", type=float, default=0.3)
+    p.add_argument("--max-animate", type=float, default=0.8)
+    p.add_argument("--noop", type=float, default=0.3, help="share of no-ops")
+    p.add_argument("--seed", type=int, default=1)
+    args = p.parse_args()
+    random.seed(args.seed)
+    asyncio.run(_run(args))
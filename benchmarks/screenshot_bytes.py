@@ -0,0 +1,87 @@
+"""
+Screenshot bytes per turn: inline base64 in events vs content-addressed store.
+
+Simulates a turn of --steps actions, each followed by a screenshot of
+--kb KB (--dup-ratio of them identical to the previous frame, e.g. a click
+that changed nothing). Counts bytes written to the events table (JSONB
+payloads), bytes pushed to each SSE client, and bytes written to the blob
+store. No services needed.
+
+    python -m benchmarks.screenshot_bytes --steps 30 --kb 300 --dup-ratio 0.3
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import tempfile
+
+from app.api.streaming import _format_sse
+from app.core.screenshots import LocalBlobBackend, ScreenshotStore, screenshot_url
+
+
+class CountingBackend(LocalBlobBackend):
+    def __init__(self, root: str):
+        super().__init__(root)
+        self.written = 0
+
+    def put(self, key: str, data: bytes) -> None:
+        self.written += len(data)
+        super().put(key, data)
+
+
+def _frames(steps: int, kb: int, dup_ratio: float):
+    frame = os.urandom(kb * 1024)  # PNGs are already compressed
+    for _ in range(steps):
+        if random.random() >= dup_ratio:
+            frame = os.urandom(kb * 1024)
+        yield frame
+
+
+def _event_bytes(seq: int, payload: dict) -> tuple[int, int]:
+    body = {"seq": seq, "type": "screenshot", "payload": payload}
+    db = len(json.dumps(payload))
+    sse = len(_format_sse("screenshot", body, seq))
+    return db, sse
+
+
+def main(args: argparse.Namespace) -> None:
+    random.seed(args.seed)
+    frames = list(_frames(args.steps, args.kb, args.dup_ratio))
+
+    db_before = sse_before = 0
+    for seq, frame in enumerate(frames, start=1):
+        payload = {"note": None, "image_b64": base64.b64encode(frame).decode()}
+        db, sse = _event_bytes(seq, payload)
+        db_before += db
+        sse_before += sse
+
+    with tempfile.TemporaryDirectory() as root:
+        backend = CountingBackend(root)
+        store = ScreenshotStore(backend)
+        db_after = sse_after = 0
+        for seq, frame in enumerate(frames, start=1):
+            key = store.put(frame)
+            payload = {"note": None, "hash": key, "url": screenshot_url(key)}
+            db, sse = _event_bytes(seq, payload)
+            db_after += db
+            sse_after += sse
+
+    mb = 1024 * 1024
+    print(f"{args.steps} screenshots of {args.kb} KB, dup ratio {args.dup_ratio}")
+    print(f"{'':<14}{'DB payloads':>14}{'SSE / client':>14}{'blob store':>14}")
+    print(f"{'inline b64':<14}{db_before / mb:>12.2f}MB{sse_before / mb:>12.2f}MB")
+    print(
+        f"{'hash + url':<14}{db_after / 1024:>12.1f}KB{sse_after / 1024:>12.1f}KB"
+        f"{backend.written / mb:>12.2f}MB"
+    )
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--steps", type=int, default=30)
+    p.add_argument("--kb", type=int, default=300, help="PNG size per screenshot")
+    p.add_argument("--dup-ratio", type=float, default=0.3)
+    p.add_argument("--seed", type=int, default=1)
+    main(p.parse_args())
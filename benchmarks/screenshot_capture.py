@@ -0,0 +1,125 @@
+"""
+Screenshot latency: in-process capture (Pillow/XCB) vs scrot + convert.
+
+For each scaling target the display runs at a common resolution with the
+same aspect ratio (XGA <- 1600x1200, WXGA <- 1920x1200, FWXGA <- 1920x1080)
+on a throwaway Xvfb, and `ComputerTool.screenshot()` is timed on both paths.
+The shell path needs scrot (or gnome-screenshot) and ImageMagick.
+
+    python -m benchmarks.screenshot_capture -n 30
+
+Without Xvfb, --synthetic times only resize + encode of a synthetic desktop
+frame (the in-process path minus the grab).
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import shutil
+import statistics
+import subprocess
+import time
+
+from PIL import Image, ImageDraw
+
+SOURCES = {
+    "XGA": (1600, 1200),
+    "WXGA": (1920, 1200),
+    "FWXGA": (1920, 1080),
+}
+
+
+def _desktop_frame(size: tuple[int, int]) -> Image.Image:
+    img = Image.new("RGB", size, (40, 44, 52))
+    d = ImageDraw.Draw(img)
+    w, h = size
+    d.rectangle((0, 0, w, 28), fill=(30, 30, 30))  # panel
+    d.rectangle((w // 10, h // 8, w * 9 // 10, h * 7 // 8), fill=(250, 250, 250))
+    for y in range(h // 8 + 40, h * 7 // 8 - 20, 22):  # lines of "text"
+        d.text((w // 10 + 30, y), "Lorem ipsum dolor sit amet " * 4, fill=(20, 20, 20))
+    return img
+
+
+def _stats(name: str, samples: list[float]) -> str:
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return (
+        f"{name:<12} p50={statistics.median(samples) * 1000:>7.1f}ms "
+        f"p99={p99 * 1000:>7.1f}ms"
+    )
+
+
+async def _time_tool(n: int, in_process: bool) -> list[float]:
+    from vendor.computer_use_demo.tools.computer import ComputerTool20250124
+
+    tool = ComputerTool20250124()
+    tool._in_process_capture = in_process
+    samples = []
+    for _ in range(n):
+        t = time.perf_counter()
+        await tool.screenshot()
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def _run_xvfb(args: argparse.Namespace) -> None:
+    for i, (target, (w, h)) in enumerate(SOURCES.items()):
+        display = 90 + i
+        xvfb = subprocess.Popen(
+            ["Xvfb", f":{display}", "-screen", "0", f"{w}x{h}x24"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        time.sleep(1.0)
+        os.environ.update(WIDTH=str(w), HEIGHT=str(h), DISPLAY_NUM=str(display))
+        try:
+            print(f"{target} ({w}x{h} display)")
+            fast = asyncio.run(_time_tool(args.n, in_process=True))
+            print("  " + _stats("in-process", fast))
+            if shutil.which("convert") and (
+                shutil.which("scrot") or shutil.which("gnome-screenshot")
+            ):
+                slow = asyncio.run(_time_tool(args.n, in_process=False))
+                print("  " + _stats("shell", slow))
+        finally:
+            xvfb.terminate()
+            xvfb.wait()
+
+
+def _run_synthetic(args: argparse.Namespace) -> None:
+    from vendor.computer_use_demo.tools.computer import (
+        MAX_SCALING_TARGETS,
+        PNG_COMPRESS_LEVEL,
+    )
+
+    for target, size in SOURCES.items():
+        frame = _desktop_frame(size)
+        dims = MAX_SCALING_TARGETS[target]
+        samples, nbytes = [], 0
+        for _ in range(args.n):
+            t = time.perf_counter()
+            img = frame.resize(
+                (dims["width"], dims["height"]),
+                Image.Resampling.BILINEAR,
+                reducing_gap=2.0,
+            )
+            buf = io.BytesIO()
+            img.save(buf, format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+            samples.append(time.perf_counter() - t)
+            nbytes = buf.tell()
+        label = f"{target} ({size[0]}x{size[1]})"
+        print(f"{label:<20} {_stats('resize+png', samples)}  {nbytes // 1024} KB")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=30, help="screenshots per case")
+    p.add_argument("--synthetic", action="store_true", help="no X server needed")
+    args = p.parse_args()
+    if args.synthetic or not shutil.which("Xvfb"):
+        if not args.synthetic:
+            print("Xvfb not found, running --synthetic")
+        _run_synthetic(args)
+    else:
+        _run_xvfb(args)
@@ -0,0 +1,64 @@
+"""
+Session-create latency with and without the warm VM pool.
+
+Uses the in-memory Docker client with a simulated container start time, so no
+daemon is needed (Redis is). Sessions arrive every --interval-ms; reports
+p50/p99 VM acquisition latency and pool hit rate for each pool size.
+
+    REDIS_URL=redis://localhost:6379/0 python -m benchmarks.session_create \
+        -n 40 --cold-ms 3000 --interval-ms 1000 --pool-sizes 0 2 4
+"""
+
+import argparse
+import time
+import uuid
+
+from app.core.redis import get_redis
+from app.session_runner.docker_manager import DockerSessionManager
+from app.session_runner.fake_docker import FakeDockerClient
+from app.session_runner.pool import WarmPool
+
+
+def _run(args: argparse.Namespace, size: int) -> None:
+    client = FakeDockerClient(start_seconds=args.cold_ms / 1000)
+    prefix = f"bench:vm:pool:{uuid.uuid4().hex[:8]}"
+    pool = WarmPool(
+        DockerSessionManager(client=client),
+        target_size=size,
+        max_size=size * 2,
+        refill_seconds=0.5,
+        key_prefix=prefix,
+    )
+    pool.start()
+    if size:
+        while get_redis().scard(pool.idle_key) < size:  # start warm
+            time.sleep(0.1)
+    try:
+        for _ in range(args.n):
+            t0 = time.perf_counter()
+            pool.acquire(str(uuid.uuid4()))
+            time.sleep(max(0.0, args.interval_ms / 1000 - (time.perf_counter() - t0)))
+    finally:
+        pool.stop()
+        st = pool.stats()
+        get_redis().delete(
+            pool.idle_key, pool.info_key, pool.stats_key, pool.latency_key
+        )
+    print(
+        f"pool={size:<3} p50={st['create_ms_p50']:>8}ms p99={st['create_ms_p99']:>8}ms "
+        f"hit_rate={st['hit_rate']}"
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    for size in args.pool_sizes:
+        _run(args, size)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=40, help="sessions created per run")
+    p.add_argument("--cold-ms", type=float, default=3000, help="container start")
+    p.add_argument("--interval-ms", type=float, default=1000, help="arrival gap")
+    p.add_argument("--pool-sizes", type=int, nargs="+", default=[0, 2, 4])
+    main(p.parse_args())
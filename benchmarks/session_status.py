@@ -0,0 +1,132 @@
+"""
+Load benchmark: the session status poll (GET /v1/sessions/{id}) at a fixed rate.
+
+Against a running API: creates `--sessions` sessions, then `--processes`
+client processes poll them round-robin, paced to `--rate` requests/sec in
+total for `--duration` seconds. The load is open loop: requests are sent on
+schedule whether or not earlier ones returned, and latency counts from the
+scheduled time, so a server that falls behind shows up as latency instead of
+a lower request rate. Reports achieved requests/sec, latency, errors and,
+from `GET /health`, the session cache hit rate and DB connections in use.
+Run once more against an API started with SESSION_CACHE_ENABLED=false for
+the uncached baseline.
+
+    python -m benchmarks.session_status --rate 5000 --processes 8
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import statistics
+import time
+
+import httpx
+
+
+def _pct(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+async def _poll(args: argparse.Namespace, sessions: list[str], n: int):
+    rate = args.rate / args.processes
+    total = int(rate * args.duration)
+    latencies: list[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url,
+        limits=httpx.Limits(max_connections=args.concurrency),
+        timeout=30.0,
+    ) as client:
+
+        async def one(i: int, scheduled: float) -> None:
+            nonlocal errors
+            sid = sessions[(i * args.processes + n) % len(sessions)]
+            try:
+                r = await client.get(f"/v1/sessions/{sid}")
+                r.raise_for_status()
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - scheduled)
+
+        tasks = []
+        t0 = time.perf_counter()
+        for i in range(total):
+            scheduled = t0 + i / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(one(i, scheduled)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - t0
+    return latencies, errors, elapsed
+
+
+def _client_process(job: tuple) -> tuple[list[float], int, float]:
+    args, sessions, n = job
+    return asyncio.run(_poll(args, sessions, n))
+
+
+def _health(client: httpx.Client) -> dict:
+    h = client.get("/health").json()
+    return {"session_cache": h.get("session_cache"), "db_pool": h.get("db_pool")}
+
+
+def main(args: argparse.Namespace) -> None:
+    headers = {"X-API-Key": args.api_key} if args.api_key else {}
+    with httpx.Client(base_url=args.base_url, headers=headers, timeout=30.0) as c:
+        sessions = []
+        for _ in range(args.sessions):
+            r = c.post("/v1/sessions")
+            r.raise_for_status()
+            sessions.append(r.json()["id"])
+        before = _health(c)
+
+        jobs = [(args, sessions, n) for n in range(args.processes)]
+        with mp.get_context("spawn").Pool(args.processes) as pool:
+            results = pool.map(_client_process, jobs)
+        after = _health(c)
+
+    latencies = [x for lat, _, _ in results for x in lat]
+    errors = sum(e for _, e, _ in results)
+    elapsed = max(t for _, _, t in results)
+    print(
+        f"target {args.rate} req/s for {args.duration:.0f}s, "
+        f"{args.processes} processes x {args.concurrency} connections"
+    )
+    print(
+        f"achieved: {len(latencies) / elapsed:.0f} req/s  errors: {errors}  "
+        f"latency ms p50={statistics.median(latencies) * 1e3:.1f} "
+        f"p99={_pct(latencies, 0.99) * 1e3:.1f} "
+        f"max={max(latencies) * 1e3:.1f}"
+    )
+    cache = after["session_cache"] or {}
+    if cache.get("enabled"):
+        prev = before["session_cache"]
+        hits = {
+            k: cache[k] - prev[k]
+            for k in ("local_hits", "redis_hits", "misses", "invalidations")
+        }
+        total = hits["local_hits"] + hits["redis_hits"] + hits["misses"]
+        rate = (hits["local_hits"] + hits["redis_hits"]) / total if total else 0.0
+        print(f"session cache (API process): {hits}, hit rate {rate:.3f}")
+    else:
+        print("session cache: disabled")
+    print(f"db pool after: {after['db_pool']}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--base-url", default="http://localhost:8000")
+    p.add_argument("--api-key", default=os.environ.get("API_KEY"))
+    p.add_argument("--rate", type=int, default=5000, help="requests/sec in total")
+    p.add_argument("--duration", type=float, default=20.0)
+    p.add_argument("--sessions", type=int, default=200)
+    p.add_argument("--processes", type=int, default=8, help="client processes")
+    p.add_argument("--concurrency", type=int, default=100, help="per process")
+    main(p.parse_args())
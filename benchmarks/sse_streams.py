@@ -0,0 +1,123 @@
+"""
+Load benchmark: how many concurrent SSE streams one API worker can hold.
+
+Opens N streams spread across S sessions against a running API (e.g. a single
+`uvicorn app.main:app --workers 1`), publishes events straight to Redis and
+reports delivery ratio, fan-out latency and REST latency while the streams are
+open.
+
+    python -m benchmarks.sse_streams --streams 2000 --sessions 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+import redis.asyncio as aioredis
+
+
+def _pct(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+async def _stream(
+    client: httpx.AsyncClient,
+    session_id: str,
+    opened: asyncio.Event,
+    counter: dict,
+    latencies: list[float],
+):
+    try:
+        async with client.stream("GET", f"/v1/sessions/{session_id}/events") as r:
+            counter["open"] += 1
+            if counter["open"] >= counter["target"]:
+                opened.set()
+            async for line in r.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                payload = json.loads(line[6:])
+                if "sent_at" in payload:
+                    latencies.append(time.perf_counter() - payload["sent_at"])
+                    counter["received"] += 1
+    except (httpx.HTTPError, asyncio.CancelledError):
+        counter["errors"] += 1
+
+
+async def main(args: argparse.Namespace) -> None:
+    sessions = [str(uuid.uuid4()) for _ in range(args.sessions)]
+    limits = httpx.Limits(max_connections=args.streams + 10)
+    timeout = httpx.Timeout(None, connect=30.0)
+    counter = {"open": 0, "received": 0, "errors": 0, "target": args.streams}
+    latencies: list[float] = []
+    opened = asyncio.Event()
+
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=timeout
+    ) as client:
+        t0 = time.perf_counter()
+        tasks = [
+            asyncio.create_task(
+                _stream(client, sessions[i % len(sessions)], opened, counter, latencies)
+            )
+            for i in range(args.streams)
+        ]
+        try:
+            await asyncio.wait_for(opened.wait(), timeout=args.open_timeout)
+        except TimeoutError:
+            pass
+        print(
+            f"streams open: {counter['open']}/{args.streams} "
+            f"in {time.perf_counter() - t0:.1f}s"
+        )
+
+        r = aioredis.Redis.from_url(args.redis_url)
+        for _ in range(args.events):
+            for sid in sessions:
+                body = {"type": "log", "payload": {"sent_at": time.perf_counter()}}
+                await r.publish(f"sessions:{sid}:events", json.dumps(body))
+            await asyncio.sleep(args.interval)
+
+        rest: list[float] = []
+        for _ in range(50):
+            t = time.perf_counter()
+            await client.get("/health")
+            rest.append(time.perf_counter() - t)
+
+        await asyncio.sleep(1.0)
+        expected = args.events * counter["open"]
+        print(f"events delivered: {counter['received']}/{expected}")
+        if latencies:
+            print(
+                f"fan-out latency ms: p50={statistics.median(latencies) * 1e3:.1f} "
+                f"p99={_pct(latencies, 0.99) * 1e3:.1f}"
+            )
+        print(
+            "/health latency ms while streaming: "
+            f"p50={statistics.median(rest) * 1e3:.1f} "
+            f"p99={_pct(rest, 0.99) * 1e3:.1f}"
+        )
+        print(f"stream errors: {counter['errors']}")
+
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await r.aclose()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--base-url", default="http://localhost:8000")
+    p.add_argument("--redis-url", default="redis://localhost:6379/0")
+    p.add_argument("--streams", type=int, default=1000)
+    p.add_argument("--sessions", type=int, default=20)
+    p.add_argument("--events", type=int, default=20, help="events per session")
+    p.add_argument("--interval", type=float, default=0.05)
+    p.add_argument("--open-timeout", type=float, default=60.0)
+    asyncio.run(main(p.parse_args()))
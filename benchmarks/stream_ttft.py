@@ -0,0 +1,97 @@
+"""
+Time to first token: non-streaming vs streaming `sampling_loop`.
+
+Runs the vendored loop against the local stub server (a text-only reply, so
+no tools run) and measures, per model call, when the first text reaches the
+callbacks: on completion without streaming, on the first delta with it.
+Also checks that both paths assemble the same message, including a
+tool_use block.
+
+    python -m benchmarks.stream_ttft -n 20 --latency-ms 300 --token-ms 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.stub_anthropic import TOOL_USE, StubServer
+from vendor.computer_use_demo import clients
+
+REPLY = " ".join(["Opening the browser and searching for the report."] * 6)
+
+
+async def _turn(url: str, stream: bool) -> tuple[float, float]:
+    from vendor.computer_use_demo.loop import APIProvider, sampling_loop
+
+    t = time.perf_counter()
+    first: list[float] = []
+
+    def mark(*_):
+        if not first:
+            first.append(time.perf_counter() - t)
+
+    await sampling_loop(
+        model="stub",
+        provider=APIProvider.ANTHROPIC,
+        system_prompt_suffix="",
+        messages=[{"role": "user", "content": "open the report"}],
+        output_callback=mark,
+        tool_output_callback=lambda *_: None,
+        api_response_callback=lambda *_: None,
+        api_key="stub",
+        tool_version="computer_use_20250124",
+        base_url=url,
+        stream_callback=(
+            (lambda e: mark() if e.type == "content_block_delta" else None)
+            if stream
+            else None
+        ),
+    )
+    return first[0], time.perf_counter() - t
+
+
+def _check_parity(url: str) -> bool:
+    from vendor.computer_use_demo.loop import _response_to_params
+
+    client = clients.get_client("anthropic", "stub", url)
+    params = dict(
+        max_tokens=1024,
+        messages=[{"role": "user", "content": "click it"}],
+        model="stub",
+        betas=[],
+    )
+    plain = client.beta.messages.with_raw_response.create(**params).parse()
+    with client.beta.messages.stream(**params) as stream:
+        for _ in stream:
+            pass
+        streamed = stream.get_final_message()
+    return _response_to_params(plain) == _response_to_params(streamed)
+
+
+def main(args: argparse.Namespace) -> None:
+    # the computer tool is constructed (not run) by the loop
+    os.environ.setdefault("WIDTH", "1024")
+    os.environ.setdefault("HEIGHT", "768")
+    latency, token = args.latency_ms / 1000, args.token_ms / 1000
+
+    with StubServer(latency_s=latency, token_s=token, tool_use=TOOL_USE) as server:
+        parity = "ok" if _check_parity(server.url) else "MISMATCH"
+    print(f"parity (text + tool_use): {parity}")
+
+    with StubServer(latency_s=latency, reply=REPLY, token_s=token) as server:
+        for name, stream in (("blocking", False), ("streaming", True)):
+            samples = [asyncio.run(_turn(server.url, stream)) for _ in range(args.n)]
+            ttft = statistics.median(s[0] for s in samples) * 1000
+            total = statistics.median(s[1] for s in samples) * 1000
+            print(f"{name:<10} ttft p50={ttft:>7.1f}ms  total p50={total:>7.1f}ms")
+    clients.close()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("-n", type=int, default=20, help="model calls per mode")
+    p.add_argument("--latency-ms", type=float, default=300.0, help="before 1st byte")
+    p.add_argument("--token-ms", type=float, default=20.0, help="between deltas")
+    main(p.parse_args())
@@ -0,0 +1,186 @@
+"""
+Local stand-in for the Messages API, for benchmarks and for pointing a worker
+at (ANTHROPIC_BASE_URL=http://127.0.0.1:8090).
+
+POST /v1/messages answers after --latency-ms with a short text reply (and,
+with --tool-use, a computer tool call), over HTTP/1.1 keep-alive. With
+"stream": true the reply is sent as SSE events, one per --token-ms. Plain
+HTTP: TLS setup, which a reused connection also saves, is not part of the
+numbers.
+
+    python -m benchmarks.stub_anthropic --port 8090 --latency-ms 300
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOOL_USE = {
+    "type": "tool_use",
+    "id": "toolu_stub0000000000000001",
+    "name": "computer",
+    "input": {"action": "left_click", "coordinate": [512, 384]},
+}
+
+
+def message_body(model: str, text: str, tool_use: dict | None = None) -> dict:
+    content: list[dict] = [{"type": "text", "text": text}]
+    if tool_use:
+        content.append(tool_use)
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": content,
+        "stop_reason": "tool_use" if tool_use else "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": 1200, "output_tokens": 40},
+    }
+
+
+def stream_events(message: dict) -> list[dict]:
+    """The SSE events that assemble into `message`."""
+    events: list[dict] = [
+        {
+            "type": "message_start",
+            "message": {
+                **message,
+                "content": [],
+                "stop_reason": None,
+                "usage": {**message["usage"], "output_tokens": 1},
+            },
+        }
+    ]
+    for i, block in enumerate(message["content"]):
+        if block["type"] == "text":
+            start = {"type": "text", "text": ""}
+            deltas = [
+                {"type": "text_delta", "text": t}
+                for t in re.findall(r"\S+\s*", block["text"])
+            ]
+        else:
+            start = {**block, "input": {}}
+            raw = json.dumps(block["input"])
+            deltas = [
+                {"type": "input_json_delta", "partial_json": raw[j : j + 8]}
+                for j in range(0, len(raw), 8)
+            ]
+        events.append(
+            {"type": "content_block_start", "index": i, "content_block": start}
+        )
+        events += [
+            {"type": "content_block_delta", "index": i, "delta": d} for d in deltas
+        ]
+        events.append({"type": "content_block_stop", "index": i})
+    events.append(
+        {
+            "type": "message_delta",
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": message["usage"]["output_tokens"]},
+        }
+    )
+    events.append({"type": "message_stop"})
+    return events
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # headers and body are separate writes; don't let Nagle hold the body
+    disable_nagle_algorithm = True
+    server: "StubServer"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.startswith("/v1/messages"):
+            self.send_error(404)
+            return
+        time.sleep(self.server.latency_s)
+        message = message_body(
+            request.get("model", "stub"), self.server.reply, self.server.tool_use
+        )
+        if request.get("stream"):
+            self._stream(message)
+            return
+        # the whole reply is generated before it is sent
+        events = stream_events(message)
+        deltas = sum(e["type"] == "content_block_delta" for e in events)
+        time.sleep(self.server.token_s * deltas)
+        body = json.dumps(message).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, message: dict) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in stream_events(message):
+            if event["type"] == "content_block_delta":
+                time.sleep(self.server.token_s)
+            data = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency_s: float = 0.0,
+        reply: str = "Done. The task is complete.",
+        token_s: float = 0.0,
+        tool_use: dict | None = None,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency_s = latency_s  # before the first byte
+        self.reply = reply
+        self.token_s = token_s  # between streamed deltas
+        self.tool_use = tool_use
+        self.connections = 0
+
+    def get_request(self):
+        self.connections += 1
+        return super().get_request()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self) -> "StubServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    p.add_argument("--port", type=int, default=8090)
+    p.add_argument("--latency-ms", type=float, default=300.0)
+    p.add_argument("--token-ms", type=float, default=20.0)
+    p.add_argument("--tool-use", action="store_true", help="reply with a click")
+    args = p.parse_args()
+    server = StubServer(
+        args.port,
+        args.latency_ms / 1000,
+        token_s=args.token_ms / 1000,
+        tool_use=TOOL_USE if args.tool_use else None,
+    )
+    print(f"stub Messages API on {server.url}")
+    server.serve_forever()
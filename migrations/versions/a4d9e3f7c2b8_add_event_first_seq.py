@@ -0,0 +1,29 @@
+"""add event first_seq
+
+Revision ID: a4d9e3f7c2b8
+Revises: f2c8a6d4b1e5
+Create Date: 2026-10-18 22:05:31.640297
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d9e3f7c2b8"
+down_revision: Union[str, Sequence[str], None] = "f2c8a6d4b1e5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # added to every partition; existing coalesced rows keep NULL
+    op.add_column("events", sa.Column("first_seq", sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("events", "first_seq")
@@ -0,0 +1,32 @@
+"""add event seq
+
+Revision ID: a8a87bbb713c
+Revises: 59409ae62377
+Create Date: 2026-01-12 10:41:17.204311
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a8a87bbb713c"
+down_revision: Union[str, Sequence[str], None] = "59409ae62377"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("events", sa.Column("seq", sa.BigInteger(), nullable=True))
+    op.create_index(
+        "ix_events_session_id_seq", "events", ["session_id", "seq"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_events_session_id_seq", table_name="events")
+    op.drop_column("events", "seq")
@@ -0,0 +1,38 @@
+"""add pagination indexes
+
+Revision ID: d5f2a8c1e9b7
+Revises: c3e1f7a9d2b4
+Create Date: 2026-10-18 14:26:09.388104
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5f2a8c1e9b7"
+down_revision: Union[str, Sequence[str], None] = "c3e1f7a9d2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_messages_session_id_id", "messages", ["session_id", "id"], unique=False
+    )
+    # covered by the leading column of ix_messages_session_id_id
+    op.drop_index(op.f("ix_messages_session_id"), table_name="messages")
+    op.create_index(
+        "ix_sessions_created_at_id", "sessions", ["created_at", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sessions_created_at_id", table_name="sessions")
+    op.create_index(
+        op.f("ix_messages_session_id"), "messages", ["session_id"], unique=False
+    )
+    op.drop_index("ix_messages_session_id_id", table_name="messages")
@@ -0,0 +1,121 @@
+"""partition events
+
+Revision ID: e7b4c2d9f1a3
+Revises: d5f2a8c1e9b7
+Create Date: 2026-10-18 16:12:47.905512
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e7b4c2d9f1a3"
+down_revision: Union[str, Sequence[str], None] = "d5f2a8c1e9b7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, session_id, seq, type, payload, created_at"
+
+# one partition per UTC day, from the oldest existing row (or today) to a week
+# ahead; the worker keeps creating them (app/core/event_partitions.py)
+CREATE_PARTITIONS = """
+DO $$
+DECLARE d date;
+BEGIN
+  FOR d IN
+    SELECT generate_series(
+      coalesce(
+        (SELECT min(created_at) AT TIME ZONE 'UTC' FROM events_unpartitioned)::date,
+        (now() AT TIME ZONE 'UTC')::date
+      ),
+      (now() AT TIME ZONE 'UTC')::date + 7,
+      interval '1 day'
+    )::date
+  LOOP
+    EXECUTE format(
+      'CREATE TABLE %I PARTITION OF events FOR VALUES FROM (%L) TO (%L)',
+      'events_p' || to_char(d, 'YYYYMMDD'),
+      d::text || ' 00:00+00',
+      (d + 1)::text || ' 00:00+00'
+    );
+  END LOOP;
+END $$;
+"""
+
+OLD_INDEXES = (
+    "events_pkey",
+    "ix_events_session_id",
+    "ix_events_type",
+    "ix_events_session_id_seq",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.rename_table("events", "events_unpartitioned")
+    for name in OLD_INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_unpartitioned")
+    # frees the name for the new table's FK
+    op.drop_constraint(
+        "events_session_id_fkey", "events_unpartitioned", type_="foreignkey"
+    )
+
+    op.create_table(
+        "events",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("seq", sa.BigInteger(), nullable=True),
+        sa.Column("type", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(
+        "ix_events_session_id_seq", "events", ["session_id", "seq"], unique=False
+    )
+    op.create_index(op.f("ix_events_type"), "events", ["type"], unique=False)
+
+    op.execute(CREATE_PARTITIONS)
+    op.execute(
+        f"INSERT INTO events ({COLUMNS}) SELECT {COLUMNS} FROM events_unpartitioned"
+    )
+    op.drop_table("events_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table("events", "events_partitioned")
+    for name in ("events_pkey", "ix_events_type", "ix_events_session_id_seq"):
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_partitioned")
+    op.drop_constraint(
+        "events_session_id_fkey", "events_partitioned", type_="foreignkey"
+    )
+
+    op.create_table(
+        "events",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("session_id", sa.UUID(), nullable=False),
+        sa.Column("type", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("seq", sa.BigInteger(), nullable=True),
+        sa.ForeignKeyConstraint(["session_id"], ["sessions.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_events_session_id"), "events", ["session_id"], unique=False
+    )
+    op.create_index(op.f("ix_events_type"), "events", ["type"], unique=False)
+    op.create_index(
+        "ix_events_session_id_seq", "events", ["session_id", "seq"], unique=False
+    )
+    op.execute(
+        f"INSERT INTO events ({COLUMNS}) SELECT {COLUMNS} FROM events_partitioned"
+    )
+    op.drop_table("events_partitioned")  # and its partitions
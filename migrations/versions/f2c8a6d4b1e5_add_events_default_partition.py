@@ -0,0 +1,29 @@
+"""add events default partition
+
+Revision ID: f2c8a6d4b1e5
+Revises: e7b4c2d9f1a3
+Create Date: 2026-10-18 21:40:12.318044
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c8a6d4b1e5"
+down_revision: Union[str, Sequence[str], None] = "e7b4c2d9f1a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # rows for a day without a partition; ensure_partitions() moves them out
+    op.execute("CREATE TABLE events_default PARTITION OF events DEFAULT")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # run `python -m app.core.event_partitions` first to keep its rows
+    op.drop_table("events_default")